@@ -5,16 +5,13 @@ if APP_ROOT not in sys.path:
     sys.path.insert(0, APP_ROOT)
 
 import streamlit as st
-from utils.ui import set_blurred_bg
-from utils.api_client import SwechaAPIClient, DEMO_MODE
+from utils.ui import get_client, set_blurred_bg
+from utils.api_client import DEMO_MODE
 
 st.set_page_config(page_title="మన సంబరాలు · Home", layout="wide")
 set_blurred_bg()
 
-@st.cache_resource
-def get_client():
-    return SwechaAPIClient()
-client = get_client()
+client = get_client()  # per-session handle; connections are pooled process-wide
 
 # session
 st.session_state.setdefault("authenticated", False)
@@ -49,7 +46,11 @@ if not st.session_state.authenticated:
                 pwd = st.text_input("Password", type="password", placeholder=("demo123" if DEMO_MODE else "••••••••"))
                 ok = st.form_submit_button("Login", width="stretch")
             if ok:
-                res = client.login(uname.strip(), pwd)
+                error = "Invalid credentials or server rejected the request."
+                try:
+                    res = client.login(uname.strip(), pwd)
+                except RuntimeError as e:
+                    res, error = None, str(e).split(" · ")[0]  # e.g. "API not reachable"
                 if res and "access_token" in res:
                     st.session_state["access_token"] = res["access_token"]
                     client.set_auth_token(res["access_token"])
@@ -58,7 +59,7 @@ if not st.session_state.authenticated:
                     st.session_state["user"] = me or {"username": uname.strip()}
                     st.success("Login successful."); st.rerun()
                 else:
-                    st.error("Invalid credentials or server rejected the request.")
+                    st.error(error)
 
         with tab_signup:
             if DEMO_MODE:
@@ -103,5 +104,6 @@ else:
                 st.session_state.user.get("username") or "User")
         st.success(f"Logged in as **{name}**")
         if st.button("Logout", type="secondary", width="stretch"):
+            client.logout(st.session_state.access_token)
             st.session_state.update({"authenticated": False, "access_token": None, "user": None})
             st.rerun()
@@ -1,13 +1,9 @@
 import streamlit as st
-from utils.api_client import SwechaAPIClient
+from utils.ui import get_client
 
 st.set_page_config(page_title="మన సంబరాలు - Mana Sambharalu", layout="wide")
 
-@st.cache_resource
-def get_client():
-    return SwechaAPIClient()
-
-client = get_client()
+client = get_client()  # per-session handle; connections are pooled process-wide
 
 # ---- session state ----
 st.session_state.setdefault("authenticated", False)
@@ -31,6 +27,7 @@ with st.sidebar:
     if st.session_state.authenticated:
         st.success(f"Logged in: {st.session_state.user.get('full_name','User')}")
         if st.button("Logout", use_container_width=True):
+            client.logout(st.session_state.access_token)
             st.session_state.update({"authenticated": False, "access_token": None, "user": None})
             st.rerun()
     else:
@@ -0,0 +1,293 @@
+# bench/load.py
+"""Load test: N simulated users going through the real pages of a running server.
+
+    python -m bench.load                                  # ramp 1, 2, 4, 8, 16 users
+    python -m bench.load --ramp 1,8,32 --sessions 3 --out load.json
+
+Starts `streamlit run Home.py` against bench.stub_api and speaks Streamlit's own
+websocket protocol to it, like a browser tab does. Each simulated user logs in on
+Home, browses Explore (including "Load more") and submits a record on Contribute.
+Everything a server process shares (client pool, connection pool, caches, snapshot,
+outbox) is shared here too. AppTest can't do this: it runs one script at a time and
+swaps the runtime per run.
+
+For each concurrency level the report has sessions/sec, rerun latency percentiles per
+step, upstream requests per session and server memory per open session.
+Needs the `websockets` package (installed with Streamlit's server dependencies).
+"""
+from __future__ import annotations
+import argparse, asyncio, importlib.util, json, os, platform, socket, subprocess, sys, tempfile, time, uuid
+import urllib.request
+
+from bench.run import APP_ROOT, _stats
+from bench.stub_api import StubAPI
+
+_DONE = {"FINISHED_SUCCESSFULLY", "FINISHED_WITH_COMPILE_ERROR"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Server:
+    """`streamlit run Home.py` in a child process, pointed at the stub API."""
+
+    def __init__(self, stub: StubAPI, cache_dir: str):
+        self.port = _free_port()
+        env = {**os.environ, "DEMO_MODE": "false", "API_BASE": stub.url, "API_TOKEN": "", "CACHE_DIR": cache_dir}
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", "Home.py", "--server.headless", "true",
+             "--server.address", "127.0.0.1", "--server.port", str(self.port),
+             "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+            cwd=APP_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.url = f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def wait_ready(self, timeout: float = 60) -> None:
+        until = time.monotonic() + timeout
+        while time.monotonic() < until:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"streamlit exited with status {self.proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=2) as r:
+                    if r.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError("streamlit did not become healthy")
+
+    def rss(self) -> int | None:
+        """Resident memory of the server process in bytes (Linux only)."""
+        try:
+            with open(f"/proc/{self.proc.pid}/statm") as fh:
+                return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def stop(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+class _Browser:
+    """One browser tab: a websocket session that reruns pages with widget values."""
+
+    def __init__(self, url: str, timeout: float):
+        self.url, self.timeout = url, timeout
+        self.ws = None
+        self.pages: dict[str, str] = {}   # url path ("" for Home) -> page_script_hash
+        self.page = ""                    # hash of the page currently shown
+        self.elements: list = []          # Element protos from the last completed script run
+
+    async def open(self) -> None:
+        from websockets.asyncio.client import connect
+
+        self.ws = await connect(self.url, subprotocols=["streamlit"], max_size=None, compression=None)
+
+    async def close(self) -> None:
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def run(self, page: str | None = None, widgets: list | None = None) -> float:
+        """Rerun (optionally another page) with `widgets` states; seconds until it finished."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        if page is not None:
+            self.page = self.pages[page]
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page
+        msg.rerun_script.widget_states.widgets.extend(widgets or [])
+        self.elements = []
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":  # sent as each script run starts, including after st.rerun()
+                self.elements = []
+                self.pages = {p.url_pathname: p.page_script_hash for p in fwd.new_session.app_pages}
+                self.page = self.page or fwd.new_session.page_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self.elements.append(fwd.delta.new_element)
+            elif kind == "script_finished":
+                status = ForwardMsg.ScriptFinishedStatus.Name(fwd.script_finished)
+                if status in _DONE:
+                    seconds = time.perf_counter() - t0
+                    if status != "FINISHED_SUCCESSFULLY":
+                        raise RuntimeError(f"script failed: {status}")
+                    errors = [e.exception.message for e in self.elements if e.WhichOneof("type") == "exception"]
+                    if errors:
+                        raise RuntimeError(errors[0])
+                    return seconds
+
+    def widget(self, kind: str, label: str):
+        """The `kind` proto (text_input, button, ...) labelled `label` in the last run, or None."""
+        for e in self.elements:
+            if e.WhichOneof("type") == kind and getattr(e, kind).label == label:
+                return getattr(e, kind)
+        return None
+
+    def alerts(self) -> list[str]:
+        return [e.alert.body for e in self.elements if e.WhichOneof("type") == "alert"]
+
+
+def _text(proto, value: str):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    return WidgetState(id=proto.id, string_value=value)
+
+
+def _click(proto):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    return WidgetState(id=proto.id, trigger_value=True)
+
+
+async def _user_session(tab: _Browser, name: str, password: str, timings: list) -> None:
+    """Home login -> Explore (+ load more) -> Contribute submit, recording (step, seconds)."""
+    async def step(label: str, page: str | None = None, widgets: list | None = None):
+        timings.append((label, await tab.run(page, widgets)))
+
+    await step("home")
+    user, pwd, login = (tab.widget("text_input", "Phone / Username"), tab.widget("text_input", "Password"),
+                        tab.widget("button", "Login"))
+    await step("home.login", widgets=[_text(user, name), _text(pwd, password), _click(login)])
+    if tab.widget("button", "Login") is not None:  # the form is only shown to anonymous sessions
+        raise RuntimeError(f"home.login: {tab.alerts() or 'still logged out'}")
+
+    await step("explore", page="Explore")
+    more = tab.widget("button", "Load more festivals")
+    if more is not None:
+        await step("explore.load_more", widgets=[_click(more)])
+
+    await step("contribute", page="Contribute")
+    title, desc, submit = (tab.widget("text_input", "Title*"), tab.widget("text_area", "Description*"),
+                           tab.widget("button", "Submit record"))
+    # Distinct text per session, or Contribute flags later sessions as near-duplicates.
+    tag = uuid.uuid4().hex + uuid.uuid4().hex
+    await step("contribute.submit", widgets=[_text(title, f"Load test {tag[:8]} by {name}"),
+                                             _text(desc, f"Submitted by bench.load: {tag}"), _click(submit)])
+    if not any(a.startswith("Record saved") for a in tab.alerts()):
+        raise RuntimeError(f"contribute.submit: {tab.alerts() or 'no confirmation shown'}")
+
+
+async def run_level(server: _Server, stub: StubAPI, users: int, sessions: int, timeout: float) -> dict:
+    """`users` concurrent users, each running `sessions` sessions back to back."""
+    await asyncio.sleep(0.5)  # sessions of the previous level have just disconnected
+    rss_before, hits_before = server.rss(), sum(stub.hits.values())
+    tabs: list[_Browser] = []     # left open until memory is measured, like idle browser tabs
+    timings: list[tuple[str, float]] = []
+    errors: list[str] = []
+
+    async def user(u: int):
+        for s in range(sessions):
+            tab = _Browser(server.url, timeout)
+            tabs.append(tab)
+            try:
+                await tab.open()
+                await _user_session(tab, f"load-{users}-{u}-{s}", stub.password, timings)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(u) for u in range(users)))
+    wall = time.perf_counter() - started
+    await asyncio.sleep(0.5)  # let the server settle before reading its memory
+    rss_after = server.rss()
+    await asyncio.gather(*(tab.close() for tab in tabs), return_exceptions=True)
+
+    live, ok = len(tabs), len(tabs) - len(errors)
+    by_step: dict[str, list[float]] = {}
+    for step, seconds in timings:
+        by_step.setdefault(step, []).append(seconds)
+    grown = (rss_after - rss_before) if rss_before is not None and rss_after is not None else None
+    return {
+        "users": users,
+        "sessions": live,
+        "failed": len(errors),
+        "wall_s": round(wall, 3),
+        "sessions_per_s": round(ok / wall, 3) if wall else None,
+        "reruns": _stats([s for _, s in timings]) if timings else None,
+        "steps": {step: _stats(v) for step, v in by_step.items()},
+        "upstream_requests_per_session": round((sum(stub.hits.values()) - hits_before) / live, 2) if live else None,
+        "server_rss_mb": round(rss_after / 2**20, 1) if rss_after is not None else None,
+        "rss_per_session_kb": round(grown / live / 1024, 1) if grown is not None and live else None,
+        "errors": errors[:5],
+    }
+
+
+async def _run(args, stub: StubAPI, server: _Server) -> list[dict]:
+    # One untimed session first: imports, image derivatives and process-wide caches.
+    warm = _Browser(server.url, args.timeout)
+    await warm.open()
+    try:
+        await _user_session(warm, "load-warmup", stub.password, [])
+    finally:
+        await warm.close()
+
+    levels = []
+    for users in args.ramp:
+        level = await run_level(server, stub, users, args.sessions, args.timeout)
+        levels.append(level)
+        reruns = level["reruns"] or {}
+        print(f"users={users:<4d} {level['sessions_per_s'] or 0:>7.2f} sessions/s  "
+              f"rerun p50={reruns.get('p50_ms', 0):>8.1f} ms  p95={reruns.get('p95_ms', 0):>8.1f} ms  "
+              f"{level['rss_per_session_kb'] or 0:>8.1f} KiB/session  failed={level['failed']}", file=sys.stderr)
+    return levels
+
+
+def run(args) -> dict:
+    if importlib.util.find_spec("websockets") is None:
+        raise SystemExit("bench.load needs the `websockets` package: pip install websockets")
+    stub = StubAPI(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate).start()
+    server = _Server(stub, tempfile.mkdtemp(prefix="mana-load-"))
+    try:
+        server.wait_ready()
+        levels = asyncio.run(_run(args, stub, server))
+    finally:
+        server.stop()
+        stub.stop()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "stub": {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate},
+            "ramp": args.ramp,
+            "sessions_per_user": args.sessions,
+        },
+        "levels": levels,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.load", description="Load-test the pages with concurrent sessions.")
+    ap.add_argument("--ramp", type=lambda s: [int(n) for n in s.split(",")], default=[1, 2, 4, 8, 16],
+                    help="comma-separated concurrent user counts (default: 1,2,4,8,16)")
+    ap.add_argument("--sessions", type=int, default=2, help="sessions each user runs per level")
+    ap.add_argument("--latency", type=float, default=0.02, help="stub API latency, seconds")
+    ap.add_argument("--jitter", type=float, default=0.005)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout", type=float, default=120, help="seconds allowed per script run")
+    ap.add_argument("--out", help="write JSON results here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 1 if any(level["failed"] for level in report["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# bench/run.py
+"""Repeatable benchmarks for the API client and the Streamlit pages.
+
+    python -m bench.run --out bench_output.json
+    python -m bench.run --baseline bench_output.json      # exit 1 on regressions
+
+Everything runs against bench.stub_api in-process with a throwaway CACHE_DIR, so
+results don't depend on api.corpus.swecha.org or DEMO_MODE. Output is JSON.
+"""
+from __future__ import annotations
+import argparse, asyncio, json, os, platform, statistics, sys, tempfile, threading, time
+
+from bench.stub_api import StubAPI
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _stats(samples: list[float], ops: int = 1) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    pick = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))]  # noqa: E731
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "max_ms": round(ms[-1], 3),
+        "ops_per_s": round(ops * len(ms) / (sum(ms) / 1000), 2) if sum(ms) else None,
+    }
+
+
+def _measure(fn, iterations: int, *, setup=None, warmup: int = 1) -> list[float]:
+    out = []
+    for i in range(warmup + iterations):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        if i >= warmup:
+            out.append(time.perf_counter() - t0)
+    return out
+
+
+def run(args) -> dict:
+    stub = StubAPI(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate).start()
+    os.environ.update(DEMO_MODE="false", API_BASE=stub.url, API_TOKEN="",
+                      CACHE_DIR=tempfile.mkdtemp(prefix="mana-bench-"))
+    if APP_ROOT not in sys.path:
+        sys.path.insert(0, APP_ROOT)
+
+    # Imported only now so module-level config picks up the stub's environment.
+    from utils import api_client
+    from utils.api_client import SwechaAPIClient, client_for
+    from utils.async_client import AsyncSwechaAPIClient
+
+    client = SwechaAPIClient()
+    payload = {"title": "Bench", "description": "Benchmark record", "category_id": 1,
+               "language": "telugu", "release_rights": "CC BY-SA 4.0"}
+
+    def forget_login_route():
+        try:
+            os.remove(api_client._LOGIN_ROUTE_FILE)
+        except FileNotFoundError:
+            pass
+
+    def forget_identities():
+        api_client._IDENTITIES._data.clear()
+
+    def forget_http_cache():
+        if client.http_cache is not None:
+            client.http_cache._conn().execute("DELETE FROM responses")
+
+    def login():
+        client.login("bench", stub.password)
+
+    def create_many_sync():
+        for _ in range(args.records):
+            client.create_record(**payload)
+
+    def categories_herd():
+        # Many sessions opening Contribute at once; single-flight turns this into one request.
+        herd = [client_for(f"bench-herd-{i}") for i in range(args.concurrency)]
+        threads = [threading.Thread(target=c.get_categories) for c in herd]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    async def _create_many_async():
+        async with AsyncSwechaAPIClient(per_host=args.concurrency, pool_size=args.concurrency) as ac:
+            ac.set_auth_token(client.token)
+            await asyncio.gather(*(ac.create_record(**payload) for _ in range(args.records)))
+
+    cases = {
+        "login.discovery_cold": (login, forget_login_route, 1),
+        "login.cached_route": (login, None, 1),
+        "session.rehydrate_cold": (client.read_users_me, forget_identities, 1),
+        "session.rehydrate_warm": (client.read_users_me, None, 1),
+        "categories.cold": (client.get_categories, forget_http_cache, 1),
+        "categories.warm": (client.get_categories, None, 1),
+        "categories.herd": (categories_herd, forget_http_cache, args.concurrency),
+        "records.create_sync": (create_many_sync, None, args.records),
+        "records.create_async": (lambda: asyncio.run(_create_many_async()), None, args.records),
+    }
+    login()
+    cases.update(_page_cases(stub, client.token))
+
+    results = {}
+    for name, (fn, setup, ops) in cases.items():
+        if args.only and not any(sel in name for sel in args.only):
+            continue
+        login()  # every case starts from a logged-in client
+        iterations = max(1, args.iterations // 4) if ops > 1 or name.startswith("page.") else args.iterations
+        results[name] = _stats(_measure(fn, iterations, setup=setup), ops)
+        print(f"{name:28s} p50={results[name]['p50_ms']:>9.2f} ms  p95={results[name]['p95_ms']:>9.2f} ms",
+              file=sys.stderr)
+    stub.stop()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "stub": {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate},
+            "iterations": args.iterations,
+            "records": args.records,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+def _page_cases(stub: StubAPI, token: str | None) -> dict:
+    """Full script runs of the pages through Streamlit's AppTest harness."""
+    from streamlit.testing.v1 import AppTest
+
+    def page(path: str, **state):
+        def go():
+            at = AppTest.from_file(os.path.join(APP_ROOT, path), default_timeout=60)
+            for k, v in state.items():
+                at.session_state[k] = v
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{path}: {at.exception[0].message}")
+        return go
+
+    def home_login():
+        at = AppTest.from_file(os.path.join(APP_ROOT, "Home.py"), default_timeout=60).run()
+        at.text_input[0].input("bench")
+        at.text_input[1].input(stub.password)
+        at.button[0].click().run()
+        if at.exception or not at.session_state["authenticated"]:
+            raise RuntimeError("Home.py: login flow failed")
+
+    authed = {"authenticated": True, "access_token": token, "user": {"username": "bench"}}
+    return {
+        "page.home_login": (home_login, None, 1),
+        "page.explore": (page("pages/2_Explore.py"), None, 1),
+        "page.contribute": (page("pages/3_Contribute.py", **authed), None, 1),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Cases whose p50 got slower than baseline by more than `tolerance` (fraction)."""
+    out = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base and base["p50_ms"] > 0 and cur["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            out.append(f"{name}: p50 {base['p50_ms']:.2f} -> {cur['p50_ms']:.2f} ms")
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.run", description="Benchmark client and pages.")
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--records", type=int, default=50, help="records per throughput iteration")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--latency", type=float, default=0.02, help="stub API latency, seconds")
+    ap.add_argument("--jitter", type=float, default=0.005)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--only", action="append", help="run cases whose name contains this (repeatable)")
+    ap.add_argument("--out", help="write JSON results here (default: stdout)")
+    ap.add_argument("--baseline", help="earlier results JSON to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown vs baseline")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            regressions = compare(report, json.load(fh), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+# bench/stub_api.py
+"""Local stand-in for the corpus API, for benchmarks and load tests.
+
+    python -m bench.stub_api --port 8765 --latency 0.05 --error-rate 0.02
+
+Implements the endpoints SwechaAPIClient probes: one login path (others 404 like a
+real backend would), one `/me` path, `categories` (with ETag / Cache-Control),
+`records` (cursor/skip paging, `updated_since` filter, POST with Idempotency-Key
+de-duplication) and `records/upload/chunk` (multipart chunks, kept per upload_uuid).
+Latency, jitter, 5xx error rate and forced-404 path patterns are configurable.
+"""
+from __future__ import annotations
+import argparse, base64, email.parser, email.policy, fnmatch, itertools, json, random, threading, time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _jwt(sub: str, ttl: float) -> str:
+    def seg(obj) -> str:
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+    return f"{seg({'alg': 'none', 'typ': 'JWT'})}.{seg({'sub': sub, 'exp': int(time.time() + ttl)})}.stub"
+
+
+class StubAPI:
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        not_found: tuple[str, ...] = (),
+        login_path: str = "auth/token",
+        me_path: str = "users/me",
+        password: str = "secret",
+        token_ttl: float = 3600,
+        categories_max_age: int = 60,
+        seed_records: int = 200,
+    ):
+        self.latency, self.jitter, self.error_rate = latency, jitter, error_rate
+        self.not_found = tuple(not_found)
+        self.login_path, self.me_path, self.password = login_path, me_path, password
+        self.token_ttl, self.categories_max_age = token_ttl, categories_max_age
+        self.categories = [{"id": 1, "name": "Festivals"}, {"id": 2, "name": "Rituals"}, {"id": 3, "name": "Food"}]
+        self.records: list[dict] = [
+            {"id": i, "title": f"Record {i}", "description": f"Seed record {i}", "category_id": 1,
+             "language": "telugu", "release_rights": "CC BY-SA 4.0", "updated_at": _now()}
+            for i in range(1, seed_records + 1)
+        ]
+        self._ids = itertools.count(seed_records + 1)
+        self._by_key: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.hits: dict[str, int] = {}
+        self.uploads: dict[str, dict[int, int]] = {}  # upload_uuid -> chunk index -> bytes
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-api", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubAPI":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --------------- request handling ---------------
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like a real server
+            disable_nagle_algorithm = True  # headers and body are separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body=None, headers: dict | None = None) -> None:
+                data = b"" if body is None else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> dict:
+                raw = self.raw_body
+                ctype = self.headers.get("Content-Type") or ""
+                if ctype.startswith("multipart/form-data"):
+                    msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                        f"Content-Type: {ctype}\r\n\r\n".encode() + raw)
+                    return {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                            for part in msg.iter_parts()}
+                if "json" in ctype:
+                    try:
+                        return json.loads(raw or b"{}")
+                    except ValueError:
+                        return {}
+                return {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+
+            def _handle(self, method: str) -> None:
+                # Always drain the body, or the next request on this keep-alive connection breaks.
+                self.raw_body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                parts = urlsplit(self.path)
+                path = parts.path.strip("/")
+                with api._lock:
+                    api.hits[f"{method} {path}"] = api.hits.get(f"{method} {path}", 0) + 1
+                if api.latency or api.jitter:
+                    time.sleep(max(0.0, api.latency + random.uniform(-api.jitter, api.jitter)))
+                if any(fnmatch.fnmatch(path, pat) for pat in api.not_found):
+                    return self._reply(404, {"detail": "Not Found"})
+                if api.error_rate and random.random() < api.error_rate:
+                    return self._reply(503, {"detail": "injected failure"})
+                route = api._route(method, path)
+                if route is None:
+                    return self._reply(404, {"detail": "Not Found"})
+                status, body, headers = route(self, parse_qs(parts.query))
+                self._reply(status, body, headers)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
+
+    def _route(self, method: str, path: str):
+        return {
+            ("POST", self.login_path): self._login,
+            ("GET", self.me_path): self._me,
+            ("GET", "categories"): self._categories,
+            ("GET", "records"): self._list_records,
+            ("POST", "records"): self._create_record,
+            ("POST", "records/upload/chunk"): self._upload_chunk,
+        }.get((method, path))
+
+    def _authed(self, req) -> str | None:
+        auth = req.headers.get("Authorization") or ""
+        return auth[7:] if auth.startswith("Bearer ") else None
+
+    def _login(self, req, _q):
+        body = req._body()
+        if body.get("password") != self.password:
+            return 401, {"detail": "Incorrect username or password"}, None
+        return 200, {"access_token": _jwt(str(body.get("username", "")), self.token_ttl), "token_type": "bearer"}, None
+
+    def _me(self, req, _q):
+        if not self._authed(req):
+            return 401, {"detail": "Not authenticated"}, None
+        return 200, {"username": "bench", "full_name": "Bench User"}, None
+
+    def _categories(self, req, _q):
+        etag = f'"cats-{len(self.categories)}"'
+        headers = {"ETag": etag, "Cache-Control": f"max-age={self.categories_max_age}"}
+        if req.headers.get("If-None-Match") == etag:
+            return 304, None, headers
+        return 200, self.categories, headers
+
+    def _list_records(self, _req, q):
+        limit = min(100, int(q.get("limit", ["20"])[0]))
+        start = int(q.get("cursor", q.get("skip", ["0"]))[0] or 0)
+        since = q.get("updated_since", [""])[0]
+        with self._lock:
+            rows = [r for r in self.records if r["updated_at"] >= since] if since else self.records
+            page = rows[start:start + limit]
+            more = start + limit < len(rows)
+        return 200, {"items": page, "next_cursor": str(start + limit) if more else None}, None
+
+    def _create_record(self, req, _q):
+        if not self._authed(req):
+            return 401, {"detail": "Not authenticated"}, None
+        payload = req._body()
+        key = req.headers.get("Idempotency-Key")
+        with self._lock:
+            if key and key in self._by_key:
+                return 200, self._by_key[key], None
+            rec = {"id": next(self._ids), **payload, "updated_at": _now()}
+            self.records.append(rec)
+            if key:
+                self._by_key[key] = rec
+        return 201, rec, None
+
+    def _upload_chunk(self, req, _q):
+        if not self._authed(req):
+            return 401, {"detail": "Not authenticated"}, None
+        form = req._body()
+        try:
+            uid, index = form["upload_uuid"].decode(), int(form["chunk_index"])
+            size = len(form["chunk"])
+        except (KeyError, ValueError):
+            return 422, {"detail": "upload_uuid, chunk_index and chunk are required"}, None
+        with self._lock:
+            self.uploads.setdefault(uid, {})[index] = size
+        return 200, {"upload_uuid": uid, "chunk_index": index}, None
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m bench.stub_api", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± seconds of random latency")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    ap.add_argument("--not-found", action="append", default=[], help="path glob to force 404 (repeatable)")
+    ap.add_argument("--login-path", default="auth/token")
+    ap.add_argument("--me-path", default="users/me")
+    ap.add_argument("--password", default="secret")
+    args = ap.parse_args(argv)
+    api = StubAPI(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        not_found=tuple(args.not_found), login_path=args.login_path, me_path=args.me_path, password=args.password,
+    ).start()
+    print(f"stub corpus API on {api.url} (password: {args.password})")
+    try:
+        api._thread.join()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
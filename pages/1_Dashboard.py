@@ -1,5 +1,17 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
+from utils.analytics import REGIONS, rollups
+from utils.api_client import client_for
+from utils.breaker import breakers
+from utils.catalog import CATALOG
+from utils.geo import geo_index
+from utils.metrics import METRICS
+from utils.snapshot import snapshot
 from utils.ui import set_blurred_bg, require_auth
+from utils.warmup import report as warmup_report
 
 st.set_page_config(page_title="Dashboard · Mana Sambharalu", layout="wide")
 set_blurred_bg()
@@ -9,3 +21,159 @@ if not require_auth(): st.stop()
 st.markdown("## Dashboard")
 st.page_link("pages/2_Explore.py",   label="🔎 Explore Records →",  width="stretch")
 st.page_link("pages/3_Contribute.py", label="➕ Contribute a Record →", width="stretch")
+
+snap = snapshot()
+snap.refresh(client_for("snapshot"))  # background delta sync
+
+# --------------- contribution analytics (materialized rollups) ---------------
+FESTIVAL_NAMES = {item["slug"]: item["en"] for item in CATALOG} | {"other": "Other / unmatched"}
+CHART = dict(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+             margin=dict(l=0, r=0, t=30, b=0), height=300)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _category_names() -> dict[str, str]:
+    return {str(c.get("id")): c.get("name") for c in client_for("snapshot").get_categories() or [] if isinstance(c, dict)}
+
+def _bar(series, title: str, names: dict | None = None):
+    df = series.head(12).rename("records").rename_axis("value").reset_index()
+    if names:
+        df["value"] = df["value"].map(lambda v: names.get(v, v))
+    fig = px.bar(df, x="records", y="value", orientation="h", title=title, color_discrete_sequence=["#ff8c32"])
+    fig.update_layout(**CHART, yaxis=dict(autorange="reversed", title=None), xaxis_title=None)
+    st.plotly_chart(fig, width="stretch")
+
+roll = rollups()
+roll.update(snap)  # folds in only snapshot files it hasn't seen; a no-op on most reruns
+
+st.markdown("### Contributions")
+if not roll.total():
+    st.caption("No records in the local snapshot yet. It fills in the background from the corpus API.")
+else:
+    total, regions = roll.total(), roll.counts("region")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Records", f"{total:,}")
+    m2.metric("Geotagged", f"{total - int(regions.get('Not geotagged', 0)):,}")
+    m3.metric("Festival identified", f"{total - int(roll.counts('festival').get('other', 0)):,}")
+    m4.metric("Languages", f"{len(roll.counts('language')):,}")
+
+    trend = roll.trend("festival")
+    if len(trend):
+        trend["festival"] = trend["festival"].map(lambda v: FESTIVAL_NAMES.get(v, v))
+        fig = px.area(trend, x="month", y="count", color="festival", title="Records per month")
+        fig.update_layout(**CHART, xaxis_title=None, yaxis_title=None, legend_title=None)
+        st.plotly_chart(fig, width="stretch")
+
+    c1, c2 = st.columns(2)
+    with c1:
+        _bar(roll.counts("festival"), "By festival", FESTIVAL_NAMES)
+        _bar(roll.counts("category_id"), "By category", _category_names())
+        _bar(roll.counts("release_rights"), "By release rights")
+    with c2:
+        _bar(regions, "By region")
+        _bar(roll.counts("language"), "By language")
+        _bar(roll.counts("month").sort_index(ascending=False), "Latest months")
+
+# --------------- map of geotagged records ---------------
+MAP_WIDTH_PX = 1200     # approximate rendered width, for the visible-area filter
+MAP_MAX_CLUSTERS = 500  # markers sent to the browser; finer detail than that is coarsened
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_geo(version: int) -> int:
+    # Once per snapshot version: geotagged rows (projected columns) into the shared index.
+    df = snapshot().read(["id", "title", "latitude", "longitude"]).dropna(subset=["latitude", "longitude"])
+    return geo_index().add_many(zip("record:" + df["id"], df["latitude"], df["longitude"], df["title"].fillna("")))
+
+_load_geo(snap.version)
+index = geo_index()
+
+st.markdown("### Where records come from")
+if not len(index):
+    st.caption("No geotagged records yet. Add latitude and longitude when contributing.")
+else:
+    c1, c2 = st.columns([1, 2])
+    focus = c1.selectbox("Centre on", ["Everywhere", *REGIONS],
+                         help="Pick a region to see its records in more detail.")
+    zoom = c2.slider("Map detail", min_value=2, max_value=14, value=5 if focus == "Everywhere" else 7,
+                     help="Higher levels split clusters into smaller areas.")
+    bbox = None
+    if focus == "Everywhere":
+        everything = index.clusters(2)
+        center_lat = float(np.average(everything.lat, weights=everything["count"]))
+        center_lon = float(np.average(everything.lon, weights=everything["count"]))
+    else:
+        center_lat, center_lon = REGIONS[focus]
+        half_lon = 360 * MAP_WIDTH_PX / (256 * 2 ** zoom)  # one map width either side
+        half_lat = half_lon / 2
+        bbox = (center_lat - half_lat, center_lat + half_lat, center_lon - half_lon, center_lon + half_lon)
+    detail = zoom
+    clusters = index.clusters(detail, bbox)
+    while len(clusters) > MAP_MAX_CLUSTERS and detail > 0:  # coarser cells until the view fits
+        detail -= 1
+        clusters = index.clusters(detail, bbox)
+    hover = np.where(clusters["count"] > 1, clusters["count"].map("{:,} records".format), clusters["label"])
+    fig = go.Figure(go.Scattermap(
+        lat=clusters.lat, lon=clusters.lon, mode="markers", text=hover, hoverinfo="text",
+        marker=dict(size=8 + 6 * np.log2(clusters["count"]), color="#ff8c32", opacity=0.75),
+    ))
+    fig.update_layout(
+        map=dict(style="carto-darkmatter", zoom=zoom, center=dict(lat=center_lat, lon=center_lon)),
+        margin=dict(l=0, r=0, t=0, b=0), height=480, paper_bgcolor="rgba(0,0,0,0)",
+    )
+    st.plotly_chart(fig, width="stretch")
+    plotted = int(clusters["count"].sum())
+    caption = f"{plotted:,} of {len(index):,} geotagged records shown as {len(clusters):,} clusters"
+    if detail < zoom:
+        caption += f" at detail {detail}, the finest that stays under {MAP_MAX_CLUSTERS:,} markers"
+    if plotted < len(index):
+        caption += f"; {len(index) - plotted:,} are outside this view"
+    st.caption(caption + ".")
+
+# --------------- API health (this server process) ---------------
+@st.fragment(run_every="5s")
+def _api_metrics():
+    st.markdown("### API health")
+    rows = METRICS.snapshot()
+    if not rows:
+        st.caption("No API calls from this server process yet.")
+        return
+    total = sum(r["requests"] for r in rows)
+    errors = sum(r["errors"] for r in rows)
+    hits = sum(r["cache_hits"] for r in rows)
+    shared = sum(r["coalesced"] for r in rows)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Upstream requests", f"{total:,}")
+    c2.metric("Error rate (5xx / network)", f"{errors / total:.1%}" if total else "–")
+    c3.metric("Served from cache", f"{hits:,}")
+    c4.metric("Coalesced", f"{shared:,}", help="Callers that shared an identical in-flight request")
+    for b in breakers():
+        if b["state"] != "closed":
+            st.warning(f"Circuit {b['state'].replace('_', '-')} for {b['host']}: requests fail fast"
+                       + (f" for another {b['retry_in']:.0f}s." if b["retry_in"] else " until a trial request succeeds."))
+
+    df = pd.DataFrame([{
+        "endpoint": f"{r['method']} /{r['path']}",
+        "requests": r["requests"],
+        "errors": r["errors"],
+        "cache hits": r["cache_hits"],
+        "coalesced": r["coalesced"],
+        "p50 ms": r["p50_ms"],
+        "p95 ms": r["p95_ms"],
+        "p99 ms": r["p99_ms"],
+        "statuses": " ".join(f"{code}×{n}" for code, n in r["statuses"].items()),
+    } for r in rows])
+    st.dataframe(df, hide_index=True, width="stretch",
+                 column_config={c: st.column_config.NumberColumn(format="%.1f") for c in ("p50 ms", "p95 ms", "p99 ms")})
+    st.caption("Percentiles are estimated from fixed latency buckets.")
+
+    text = METRICS.to_prometheus()
+    with st.expander("Prometheus export"):
+        st.download_button("Download metrics.txt", text, file_name="metrics.txt", mime="text/plain")
+        st.code(text, language="text")
+
+    warm = warmup_report()
+    if warm:
+        with st.expander(f"Startup warm-up ({sum(r['ms'] for r in warm) / 1000:.1f}s)"):
+            st.dataframe(pd.DataFrame(warm), hide_index=True, width="stretch")
+
+
+_api_metrics()
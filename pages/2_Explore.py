@@ -1,96 +1,160 @@
 ﻿# pages/2_Explore.py
 from __future__ import annotations
-import os
+import html
 import streamlit as st
-from utils.api_client import SwechaAPIClient, DEMO_MODE
-from utils.ui import set_blurred_bg
+from utils.api_client import DEMO_MODE, client_for
+from utils.ui import get_client, set_blurred_bg
+from utils.catalog import CATALOG
+from utils.images import ensure_derivatives, pick_variant, placeholder, srcset
+from utils.search import festival_index, record_index
+from utils.snapshot import snapshot
+from utils.static import serving, url_for
 
 st.set_page_config(page_title="Explore · Mana Sambharalu", layout="wide")
 set_blurred_bg()  # blurred goddess background
 
 st.markdown("""
 <style>
-[data-testid="stImage"] img {
+[data-testid="stImage"] img, img.card-img {
     width: 100% !important;
     height: 260px !important;
     object-fit: cover !important;
     border-radius: 16px;
     box-shadow: 0 8px 22px rgba(0,0,0,.25);
 }
+img.card-img { display: block; background-size: cover; background-position: center; }
 </style>
 """, unsafe_allow_html=True)
 
 
 st.title("🔎 Explore Telangana\nFestivals")
 
-# ------------------------------------------------------------------
-# Static catalog (local images)
-# ------------------------------------------------------------------
-HERE = os.path.dirname(os.path.abspath(__file__))
-ASSETS = os.path.normpath(os.path.join(HERE, "..", "assets"))
-IMG_DIR = os.path.join(ASSETS, "festivals")
-
-CATALOG = [
-    {
-        "slug": "bathukamma",
-        "img": os.path.join(IMG_DIR, "bathukamma.jpg"),
-        "en": "Bathukamma 🌼",
-        "te": "బతుకమ్మ 🌼",
-        "desc_en": "Flower festival celebrating life and sisterhood across Telangana.",
-        "desc_te": "దసరా ముందు తొమ్మిది రోజులు జరుపుకునే తెలంగాణ పుష్పాల పండుగ.",
-    },
-    {
-        "slug": "bonalu",
-        "img": os.path.join(IMG_DIR, "bonalu.jpg"),
-        "en": "Bonalu 🪔",
-        "te": "బోనాలు 🪔",
-        "desc_en": "Offerings to Mahankali with decorated pots, dances and drums.",
-        "desc_te": "మహాంకాళి అమ్మవారికి అలంకరించిన బొనాలతో నివేదనలు, డప్పులతో నృత్యాలు.",
-    },
-    {
-        "slug": "ugadi",
-        "img": os.path.join(IMG_DIR, "ugadi.jpg"),
-        "en": "Ugadi 🥭",
-        "te": "ఉగాది 🥭",
-        "desc_en": "Telugu New Year marked with ‘Ugadi Pachadi’—six tastes of life.",
-        "desc_te": "తెలుగు నూతన సంవత్సరం. ‘ఉగాది పచ్చడి’తో జీవన ఆరు రుచుల సందేశం.",
-    },
-    {
-        "slug": "sri_rama_navami",
-        "img": os.path.join(IMG_DIR, "sri_rama_navami.jpg"),
-        "en": "Sri Rama Navami 🏹",
-        "te": "శ్రీరామనవమి 🏹",
-        "desc_en": "Celebrates the birth of Lord Rama with kalyanam and prasadam.",
-        "desc_te": "శ్రీరామ జన్మోత్సవం. కల్యాణం, ప్రత్యేక పూజలు, ప్రసాదం.",
-    },
-    {
-        "slug": "vinayaka_chavithi",
-        "img": os.path.join(IMG_DIR, "vinayaka_chavithi.jpg"),
-        "en": "Vinayaka Chavithi 🐘",
-        "te": "వినాయక చవితి 🐘",
-        "desc_en": "Ganesh festival—install, worship and immerse Lord Ganesha.",
-        "desc_te": "గణేశుని ప్రతిష్ఠించుకుని పూజలతో ఘనంగా జరుపుకునే పండుగ.",
-    },
-    {
-        "slug": "navaratri",
-        "img": os.path.join(IMG_DIR, "navaratri.jpg"),
-        "en": "Navaratri ✨",
-        "te": "నవరాత్రి ✨",
-        "desc_en": "Nine nights of Devi worship, music and dance.",
-        "desc_te": "దేవీ ఉపాసన, సంగీత నృత్యాలతో తొమ్మిది రాత్రుల మహోత్సవం.",
-    },
-]
+# Resized variants instead of the full originals, as fingerprinted static URLs the browser
+# caches for good (built once per process). Every width goes out as a srcset, so a phone
+# fetches a 240/480px file and a wide screen the 960px one, over the blurred placeholder.
+# Without static serving there are no URLs to list: st.image gets one desktop-sized file.
+CARD_WIDTH = 640  # px; a card is half of the wide layout
+CARD_SIZES = "(max-width: 640px) 100vw, 50vw"  # the two columns stack on narrow screens
+
+@st.cache_resource
+def _card_images() -> dict[str, tuple[str | None, str]]:
+    """Image source -> (<picture> markup or None, single-file fallback for st.image)."""
+    manifest = ensure_derivatives([item["img"] for item in CATALOG])
+    out = {}
+    for item in CATALOG:
+        src = item["img"]
+        fallback = pick_variant(manifest, src, CARD_WIDTH)
+        webp, jpeg = srcset(manifest, src, url_for), srcset(manifest, src, url_for, webp=False)
+        if not serving() or webp is None:
+            out[src] = (None, url_for(fallback))
+            continue
+        out[src] = (
+            f'<picture><source type="image/webp" srcset="{webp}" sizes="{CARD_SIZES}">'
+            f'<img class="card-img" src="{url_for(pick_variant(manifest, src, CARD_WIDTH, webp=False))}" '
+            f'srcset="{jpeg}" sizes="{CARD_SIZES}" alt="{html.escape(item["en"])}" decoding="async" '
+            f'style="background-image: url({placeholder(manifest, src)})"></picture>',
+            url_for(fallback),
+        )
+    return out
+
+card_images = _card_images()
+
+q = st.text_input("Search festivals", placeholder="e.g. bathukamma, బోనాలు, ugadi…").strip()
+items = [doc for _, doc, _ in festival_index().search(q, 0)] if q else CATALOG
+if not items:
+    st.info("No festivals found. Try another search term.")
+
+# Only a page worth of cards is built per rerun; "Load more" extends it.
+PAGE_SIZE = 6
+if st.session_state.get("explore_q") != q:
+    st.session_state.update(explore_q=q, explore_shown=PAGE_SIZE)
+shown = st.session_state.setdefault("explore_shown", PAGE_SIZE)
 
 # ------------------------------------------------------------------
 # Responsive 2-column grid so widths match
 # ------------------------------------------------------------------
 cols = st.columns(2, gap="large")
 
-for i, item in enumerate(CATALOG):
+for i, item in enumerate(items[:shown]):
     with cols[i % 2]:
         with st.container(border=True):
-            st.image(item["img"], caption=None, width="stretch")  # width is uniform via column
+            markup, fallback = card_images[item["img"]]
+            if markup:
+                st.markdown(markup, unsafe_allow_html=True)
+            else:
+                st.image(fallback, caption=None, width="stretch")  # width is uniform via column
             # Names + short descriptions
             st.markdown(f"## {item['en']}  \n### {item['te']}")
             st.write(item["desc_en"])
             st.write(item["desc_te"])
+
+if len(items) > shown:
+    st.button("Load more festivals", width="stretch",
+              on_click=lambda: st.session_state.update(explore_shown=shown + PAGE_SIZE))
+
+# ------------------------------------------------------------------
+# Community records: from the local snapshot, or a page at a time from the API
+# ------------------------------------------------------------------
+RECORDS_PAGE = 20
+MAX_PAGES_SHOWN = 5  # rendered window; older pages drop off as more load
+RECORD_COLUMNS = ["id", "title", "description", "language", "release_rights"]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _records_page(cursor: str | None, auth_scope: str | None, _client) -> tuple[list[dict], str | None]:
+    # Cached per cursor and auth scope, so sessions share pages but never another user's view.
+    return _client.list_records(cursor, limit=RECORDS_PAGE)
+
+def _snapshot_page(cursor: str | None) -> tuple[list[dict], str | None]:
+    start = int(cursor[len("offset:"):]) if cursor and cursor.startswith("offset:") else 0
+    end = start + RECORDS_PAGE
+    return records.iloc[start:end].to_dict("records"), (f"offset:{end}" if end < len(records) else None)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _newest_first(version: int):
+    # One sorted copy per snapshot version, shared by every session.
+    df = snapshot().read([*RECORD_COLUMNS, "updated_at"])
+    return df.sort_values("updated_at", ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+
+client = get_client()
+snap = snapshot()
+snap.refresh(client_for("snapshot"))  # background delta sync, at most every few minutes
+records = _newest_first(snap.version)
+
+st.markdown("### Community records")
+# With a snapshot, records are searched locally (the index follows its deltas).
+rq = st.text_input("Search records", placeholder="e.g. bonalu procession, బోనాలు…").strip() if len(records) else ""
+# API cursors and snapshot offsets mean different things: start over when the source changes.
+source = "snapshot" if len(records) else "api"
+if st.session_state.get("explore_source") != source:
+    st.session_state.update(explore_source=source, explore_cursors=[None])
+cursors = st.session_state.explore_cursors
+nxt = None
+rec_cols = st.columns(2, gap="large")
+n = 0
+if rq:
+    index = record_index()
+    index.update(snap)
+    pages = [([doc for _, doc, _ in index.search(rq, RECORDS_PAGE * MAX_PAGES_SHOWN)], None)]
+else:
+    pages = (_snapshot_page(cur) if len(records) else _records_page(cur, client.auth_scope, client) for cur in cursors)
+for page, nxt in pages:
+    for rec in page:
+        with rec_cols[n % 2]:
+            with st.container(border=True):
+                st.markdown(f"**{rec.get('title') or 'Untitled'}**")
+                st.write(rec.get("description") or "")
+                st.caption(" · ".join(str(v) for v in (rec.get("language"), rec.get("release_rights")) if v))
+        n += 1
+if not n:
+    st.caption("No records match that search." if rq else "No community records yet.")
+
+def _load_more(next_cursor: str) -> None:
+    window = st.session_state.explore_cursors + [next_cursor]
+    st.session_state.explore_cursors = window[-MAX_PAGES_SHOWN:]
+
+c1, c2 = st.columns(2)
+if nxt:
+    c1.button("Load more records", width="stretch", on_click=_load_more, args=(nxt,))
+if cursors[0] is not None:
+    c2.button("Back to newest", width="stretch",
+              on_click=lambda: st.session_state.update(explore_cursors=[None]))
@@ -1,15 +1,32 @@
 ﻿from __future__ import annotations
+import asyncio, uuid
 import streamlit as st
-from utils.api_client import SwechaAPIClient, DEMO_MODE
+from utils.api_client import DEMO_MODE
+from utils.async_client import AsyncSwechaAPIClient
+from utils.bulk_import import checkpoint_path_for, detect_format, import_records
+from utils.dedup import duplicate_index
+from utils.media import ACCEPTED, UploadError, receive, spool
+from utils.outbox import FAILED, Outbox, OutboxFlusher
+from utils.records import RELEASE_RIGHTS, build_record
+from utils.geo import geo_index
+from utils.search import record_index
+from utils.snapshot import snapshot
+from utils.ui import get_client, media_uploader
 
 st.set_page_config(page_title="Contribute · Mana Sambharalu", layout="wide")
 st.title("➕ Contribute a Record")
 
+client = get_client()
+
 @st.cache_resource
-def get_client():
-    return SwechaAPIClient()
+def get_outbox():
+    outbox = Outbox()
+    return outbox, OutboxFlusher(outbox).start()
 
-client = get_client()
+outbox, flusher = get_outbox()
+duplicates = duplicate_index()
+duplicates.refresh(snapshot())  # new snapshot files are indexed on a background thread
+owner = st.session_state.setdefault("outbox_owner", uuid.uuid4().hex)
 
 # LIVE requires login
 if not DEMO_MODE and not st.session_state.get("authenticated"):
@@ -18,18 +35,24 @@ if not DEMO_MODE and not st.session_state.get("authenticated"):
     st.stop()
 
 @st.cache_data(ttl=600)
-def _get_categories():
-    cats = client.get_categories() or []
+def _get_categories(auth_scope: str | None, _client):
+    cats = _client.get_categories() or []
     if not cats:
         cats = [{"id": 1, "name": "Festivals"}]
     return cats
 
-cats = _get_categories()
+cats = _get_categories(client.auth_scope, client)
 cat_names = [c["name"] for c in cats]
 cat_id_by_name = {c["name"]: c["id"] for c in cats}
 
 st.markdown("Fill the details below to add a new festival record.")
 
+# New key after each submit, so the previous file is let go. With the chunk receiver on,
+# the file streams to disk while the form is filled in; otherwise st.file_uploader holds
+# it in memory (up to server.maxUploadSize) until it is spooled.
+media_key = f"media_{st.session_state.setdefault('media_nonce', 0)}"
+streamed = media_uploader("Photo, video or audio (optional)", key=media_key)
+
 with st.form("contribute_form", enter_to_submit=False):
     col_a, col_b = st.columns([2, 1])
 
@@ -40,46 +63,116 @@ with st.form("contribute_form", enter_to_submit=False):
             placeholder="A short description of the festival moment, significance, etc."
         )
         language = st.text_input("Language", value="telugu")
+        not_duplicate = st.checkbox("Submit even if similar records exist",
+                                    help="Use this when the record is new despite a similar title or description.")
 
     with col_b:
         cat_name = st.selectbox("Category", options=cat_names, index=0)
-        rights = st.selectbox(
-            "Release rights",
-            options=["CC BY-SA 4.0", "CC BY 4.0", "Public Domain (CC0)", "All rights reserved"],
-            index=0,
-        )
+        rights = st.selectbox("Release rights", options=RELEASE_RIGHTS, index=0)
         lat = st.number_input("Latitude (optional)", step=0.000001, format="%.6f")
         lon = st.number_input("Longitude (optional)", step=0.000001, format="%.6f")
 
+    media_file = None if streamed is not None else st.file_uploader(
+        "Photo, video or audio (optional)", type=ACCEPTED, key=media_key)
     st.divider()
     submitted = st.form_submit_button("Submit record", width="stretch")
 
 if submitted:
-    problems = []
-    if not title.strip():
-        problems.append("Title is required.")
-    if not description.strip():
-        problems.append("Description is required.")
+    payload, problems = build_record(
+        title=title,
+        description=description,
+        category_id=cat_id_by_name.get(cat_name, 1),
+        language=language,
+        release_rights=rights,
+        latitude=lat,
+        longitude=lon,
+    )
+    similar = [] if problems or not_duplicate else duplicates.similar(payload)
+    media = None
+    if not problems and not similar:
+        try:
+            if streamed and not streamed["done"]:
+                problems.append(f"{streamed['filename']} is still uploading. Submit again once it has finished.")
+            elif streamed:
+                with st.spinner(f"Preparing {streamed['filename']}…"):
+                    media = receive(streamed["slot"], streamed["filename"])  # images cleaned of EXIF
+            elif media_file is not None:
+                with st.spinner(f"Preparing {media_file.name}…"):
+                    media = spool(media_file, media_file.name)  # to disk in blocks; images cleaned of EXIF
+        except UploadError as e:
+            problems.append(str(e))
     if problems:
         st.error(" ".join(problems))
-        st.stop()
-
-    with st.spinner("Creating record…"):
-        rec = client.create_record(
-            title=title.strip(),
-            description=description.strip(),
-            category_id=cat_id_by_name.get(cat_name, 1),
-            language=language.strip() or "telugu",
-            release_rights=rights,
-            latitude=(lat if lat else None),
-            longitude=(lon if lon else None),
-        )
+    elif similar:
+        st.warning("This looks like a record that is already in the corpus or waiting to be sent:\n\n"
+                   + "\n".join(f"- {label or key} ({score:.0%} similar)" for key, label, score in similar)
+                   + "\n\nIf it is a different record, tick **Submit even if similar records exist** and submit again.")
+    else:
+        # Saved locally first; the background flusher uploads the media and delivers the record.
+        row_id = outbox.enqueue(payload, owner=owner, token=st.session_state.get("access_token"), media=media)
+        flusher.wake()
+        record_index().add(f"outbox:{row_id}", payload)
+        duplicates.add(f"outbox:{row_id}", payload)
+        geo_index().add(f"outbox:{row_id}", payload["latitude"], payload["longitude"], payload["title"])
+        st.session_state.media_nonce += 1
+        st.session_state.pop(f"{media_key}_slot", None)
+        st.success(f"Record saved (#{row_id}). It will be sent to the corpus in the background.")
+        st.toast("Thanks for your contribution!", icon="🎉")
+        st.balloons()
+
+@st.fragment(run_every="3s")
+def _submission_status():
+    rows = outbox.recent(owner)
+    if not rows:
+        return
+    st.markdown("#### Your submissions")
+    st.dataframe(
+        [{"#": r["id"], "title": r["title"], "status": r["status"], "attempts": r["attempts"],
+          "record id": r["remote_id"] or "", "last error": r["error"] or ""} for r in rows],
+        width="stretch", hide_index=True,
+    )
+    if any(r["status"] == FAILED for r in rows) and st.button("Retry failed"):
+        try:
+            outbox.retry_failed(owner, st.session_state.get("access_token"))
+        except PermissionError as e:
+            st.warning(str(e))
+        else:
+            flusher.wake()
+
+_submission_status()
+
+# ------------------------------------------------------------------
+# Bulk import (CSV with a header row, or JSONL — same fields as the form)
+# ------------------------------------------------------------------
+with st.expander("Bulk import from CSV / JSONL"):
+    st.caption("Columns: title, description, category_id, language, release_rights, latitude, longitude. "
+               "Interrupted imports resume from where they stopped when the same file is uploaded again.")
+    records_file = st.file_uploader("Records file", type=["csv", "jsonl", "ndjson"], key="bulk_file")
+    dry_run = st.checkbox("Validate only (don't send)", value=False)
+    skip_similar = st.checkbox("Skip rows that look like existing records", value=True,
+                               help="Rows resembling a record in the corpus snapshot, or an earlier row, are reported "
+                                    "and not sent. Untick to send them anyway.")
+    if records_file is not None and st.button("Start import", width="stretch"):
+        status = st.empty()
+
+        def _progress(rep):
+            done = rep.created + rep.rejected + rep.failed
+            if done % 50 == 0:  # don't flood the browser with one delta per row
+                status.caption(f"{done} rows processed…")
 
-    if not rec:
-        st.error("Could not create the record. Please try again.")
-        st.stop()
+        async def _run():
+            async with AsyncSwechaAPIClient() as bulk:
+                if st.session_state.get("access_token"):
+                    bulk.set_auth_token(st.session_state.access_token)
+                return await import_records(
+                    records_file, client=bulk, fmt=detect_format(records_file.name),
+                    checkpoint=checkpoint_path_for(records_file), dry_run=dry_run,
+                    duplicates=duplicates, skip_duplicates=skip_similar, on_progress=_progress,
+                )
 
-    rec_id = rec.get("id") if isinstance(rec, dict) else None
-    st.success(f"Record created successfully! {('(ID: ' + str(rec_id) + ')') if rec_id else ''}")
-    st.toast("Thanks for your contribution!", icon="🎉")
-    st.balloons()
+        rep = asyncio.run(_run())
+        status.empty()
+        st.success(f"Created {rep.created} · rejected {rep.rejected} · failed {rep.failed} · "
+                   f"near-duplicates {rep.duplicates} · resumed past {rep.skipped} · {rep.seconds:.1f}s")
+        if rep.errors:
+            st.dataframe([{"row": r, "problem": why} for r, why in rep.errors], width="stretch")
@@ -0,0 +1,7 @@
+# tests/conftest.py
+"""Keep test runs away from the app's own cache and the live API."""
+import os, tempfile
+
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="mana-tests-")
+os.environ["DEMO_MODE"] = "false"
+os.environ.setdefault("WARMUP", "false")
@@ -0,0 +1,56 @@
+# tests/test_breaker.py
+from types import SimpleNamespace
+
+import pytest
+
+from utils import breaker
+from utils.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(breaker, "time", SimpleNamespace(monotonic=lambda: now.t))
+    return now
+
+
+def test_opens_after_consecutive_failures(clock):
+    b = CircuitBreaker("api.test", failures=3, reset=30)
+    for _ in range(2):
+        assert b.allow()
+        b.record(False)
+    assert b.state == CLOSED
+    b.record(True)  # a success resets the streak
+    for _ in range(3):
+        assert b.allow()
+        b.record(False)
+    assert b.state == OPEN and b.trips == 1
+    assert not b.allow()
+    with pytest.raises(CircuitOpen):
+        b.check()
+    clock.t += 10
+    assert b.retry_in() == pytest.approx(20)
+
+
+def test_half_open_lets_one_trial_through_and_closes_on_success(clock):
+    b = CircuitBreaker("api.test", failures=1, reset=30)
+    b.record(False)
+    clock.t += 30
+    assert b.state == HALF_OPEN
+    assert b.allow()
+    assert not b.allow()  # the trial is still in flight
+    b.record(True)
+    assert b.state == CLOSED and b.allow()
+
+
+def test_failed_trial_reopens_for_another_reset(clock):
+    b = CircuitBreaker("api.test", failures=1, reset=30)
+    b.record(False)
+    clock.t += 31
+    assert b.allow()
+    b.record(False)
+    assert b.state == OPEN and b.trips == 2
+    clock.t += 29
+    assert not b.allow()
+    clock.t += 1
+    assert b.allow()
@@ -0,0 +1,73 @@
+# tests/test_bulk_import.py
+import asyncio, io, json
+
+from utils.bulk_import import _Watermark, import_records
+
+HEADER = "title,description,category_id,language,release_rights\n"
+
+
+def _csv(n: int, *, bad: set[int] = frozenset()) -> bytes:
+    rows = [f"{'' if i in bad else f'Festival row {i}'},A long enough description for row {i},1,telugu,CC BY 4.0\n"
+            for i in range(1, n + 1)]
+    return (HEADER + "".join(rows)).encode()
+
+
+class FakeAPI:
+    """Refuses the rows in `refuse` (by row number in the title); remembers every key it saw."""
+
+    def __init__(self, refuse=()):
+        self.refuse, self.sent, self.keys = set(refuse), [], []
+
+    async def create_record(self, idempotency_key=None, **payload):
+        row = int(payload["title"].split()[-1])
+        self.sent.append(row)
+        self.keys.append(idempotency_key)
+        return None if row in self.refuse else {"id": row}
+
+
+def _run(data: bytes, api: FakeAPI, checkpoint: str):
+    return asyncio.run(import_records(io.BytesIO(data), client=api, checkpoint=checkpoint, concurrency=4))
+
+
+def test_watermark_advances_over_out_of_order_rows():
+    mark = _Watermark(0)
+    for row in (2, 3, 5):
+        mark.mark(row)
+    assert mark.done == 0
+    mark.mark(1)
+    assert mark.done == 3
+    mark.mark(4)
+    assert mark.done == 5
+
+
+def test_resume_sends_only_the_rows_that_failed(tmp_path):
+    data, ckpt = _csv(300, bad={7}), str(tmp_path / "import.json")
+
+    api = FakeAPI(refuse={5, 150})
+    report = _run(data, api, ckpt)
+    assert (report.created, report.failed, report.rejected) == (297, 2, 1)
+    state = json.loads(open(ckpt).read())
+    assert state["done"] == 300 and state["failed"] == [5, 150]
+
+    api = FakeAPI(refuse={150})
+    report = _run(data, api, ckpt)
+    assert sorted(api.sent) == [5, 150]
+    assert (report.created, report.failed, report.skipped) == (1, 1, 298)
+
+    api = FakeAPI()
+    report = _run(data, api, ckpt)
+    assert api.sent == [150] and report.failed == 0
+    assert json.loads(open(ckpt).read())["failed"] == []
+
+
+def test_keys_are_per_row_and_stable_across_resumes(tmp_path):
+    same = "Same title 1,Same description for every row,1,telugu,CC BY 4.0\n"
+    data, ckpt = (HEADER + same * 3).encode(), str(tmp_path / "import.json")
+
+    api = FakeAPI(refuse={1})  # every row is titled "... 1", so all three fail
+    _run(data, api, ckpt)
+    assert len(set(api.keys)) == 3  # identical rows are still three records
+
+    retry = FakeAPI()
+    _run(data, retry, ckpt)
+    assert sorted(retry.keys) == sorted(api.keys)
@@ -0,0 +1,77 @@
+# tests/test_rollups.py
+from datetime import datetime, timedelta, timezone
+
+from utils.analytics import Rollups
+from utils.snapshot import Snapshot
+
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeAPI:
+    """Just enough of SwechaAPIClient.list_records for Snapshot.sync."""
+
+    def __init__(self):
+        self.records, self._tick = {}, 0
+
+    def put(self, rid: str, **fields) -> None:
+        self._tick += 1
+        stamp = (_EPOCH + timedelta(days=31 * (self._tick % 3), seconds=self._tick)).isoformat()
+        old = self.records.get(rid, {"id": rid, "created_at": stamp, "category_id": "1",
+                                     "release_rights": "CC BY 4.0", "description": ""})
+        self.records[rid] = {**old, **fields, "updated_at": (_EPOCH + timedelta(days=400, seconds=self._tick)).isoformat()}
+
+    def list_records(self, cursor=None, limit=20, updated_since=None):
+        rows = sorted(self.records.values(), key=lambda r: r["updated_at"])
+        if updated_since:
+            rows = [r for r in rows if r["updated_at"] >= updated_since]
+        start = int(cursor or 0)
+        end = start + limit
+        return rows[start:end], (str(end) if end < len(rows) else None)
+
+
+def _setup(tmp_path):
+    api = FakeAPI()
+    for i in range(30):
+        api.put(str(i), title="Bonalu at Golconda" if i < 18 else "Ugadi morning", language="telugu")
+    snap = Snapshot(str(tmp_path / "snapshot"))
+    snap.sync(api)
+    rollups = Rollups(str(tmp_path / "rollups"))
+    assert rollups.update(snap)
+    return api, snap, rollups
+
+
+def test_totals_after_first_update(tmp_path):
+    _, _, rollups = _setup(tmp_path)
+    assert rollups.total() == 30
+    assert rollups.counts("festival").to_dict() == {"bonalu": 18, "ugadi": 12}
+    assert int(rollups.trend()["count"].sum()) == 30
+
+
+def test_changed_record_moves_between_groups(tmp_path):
+    api, snap, rollups = _setup(tmp_path)
+    api.put("0", title="Ugadi at home", language="English")
+    api.put("30", title="Bonalu procession", language="telugu")
+    assert snap.sync(api).changed == 2
+    assert rollups.update(snap)
+
+    assert rollups.total() == 31
+    assert rollups.counts("festival").to_dict() == {"bonalu": 18, "ugadi": 13}
+    assert rollups.counts("language").to_dict() == {"telugu": 30, "english": 1}
+    assert not rollups.update(snap)  # nothing new
+
+
+def test_totals_survive_compaction_and_reload(tmp_path):
+    api, snap, rollups = _setup(tmp_path)
+    api.put("5", title="Ugadi again")
+    snap.sync(api)
+    rollups.update(snap)
+    before = {dim: rollups.counts(dim).to_dict() for dim in ("festival", "month", "language")}
+
+    snap.compact()
+    assert rollups.update(snap)  # the new base is read, but changes nothing
+    after = {dim: rollups.counts(dim).to_dict() for dim in ("festival", "month", "language")}
+    assert after == before and rollups.total() == 30
+
+    reloaded = Rollups(str(tmp_path / "rollups"))
+    assert reloaded.counts("festival").to_dict() == before["festival"]
+    assert not reloaded.update(snap)
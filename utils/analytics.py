@@ -0,0 +1,212 @@
+# utils/analytics.py
+"""Contribution analytics as materialized rollups over the records snapshot.
+
+Every record is reduced to a row of dimensions (festival, month, region, category,
+language, release rights). The rollup is a count "cube" over all of them together,
+usually a few thousand rows however many records there are. Per-dimension counts
+and trends are sums over the cube. New snapshot files are folded in as upserts:
+records that changed are subtracted under their old dimensions and added under the
+new ones, so re-applying a file is harmless. Everything is vectorized pandas/NumPy
+and persisted under CACHE_DIR/rollups.
+"""
+from __future__ import annotations
+import os, re, threading, unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.api_client import CACHE_DIR, _read_json, _write_json
+from utils.catalog import CATALOG
+
+ROLLUP_DIR = os.path.join(CACHE_DIR, "rollups")
+ROLLUP_FORMAT = 2  # bump when dimensions() changes; rollups saved by another format are rebuilt
+DIMENSIONS = ["festival", "month", "region", "category_id", "language", "release_rights"]
+SOURCE_COLUMNS = ["id", "title", "description", "category_id", "language", "release_rights",
+                  "latitude", "longitude", "created_at", "updated_at"]
+UNKNOWN = "Unknown"
+
+# Spellings people actually use, beyond the catalog's own names.
+FESTIVAL_ALIASES = {
+    "bathukamma": ["batukamma", "bathukamma"],
+    "sri_rama_navami": ["rama navami", "ramanavami", "sri ramanavami", "sriramanavami"],
+    "vinayaka_chavithi": ["vinayaka chaturthi", "ganesh chaturthi", "ganesha chaturthi", "vinayaka chavithi"],
+    "navaratri": ["navratri", "navarathri", "dasara", "dussehra", "దసరా"],
+}
+
+# Approximate state / UT centres; a record belongs to the nearest one (coarse near borders).
+REGIONS = {
+    "Telangana": (17.9, 79.1), "Andhra Pradesh": (15.9, 79.7), "Karnataka": (15.3, 75.7),
+    "Tamil Nadu": (11.1, 78.7), "Kerala": (10.5, 76.3), "Maharashtra": (19.7, 75.7),
+    "Odisha": (20.9, 85.1), "Chhattisgarh": (21.3, 81.9), "Goa": (15.3, 74.1),
+    "Gujarat": (22.3, 71.2), "Madhya Pradesh": (23.5, 78.6), "Rajasthan": (27.0, 74.2),
+    "Uttar Pradesh": (26.8, 80.9), "Bihar": (25.1, 85.3), "Jharkhand": (23.6, 85.3),
+    "West Bengal": (22.9, 87.9), "Delhi": (28.7, 77.1), "Punjab": (31.1, 75.3),
+    "Haryana": (29.1, 76.1), "Uttarakhand": (30.1, 79.0), "Himachal Pradesh": (31.9, 77.1),
+    "Jammu & Kashmir": (33.8, 75.0), "Assam": (26.2, 92.9), "North East": (25.0, 94.0),
+    "Puducherry": (11.9, 79.8),
+}
+_INDIA = (6.0, 37.5, 68.0, 97.5)  # lat_min, lat_max, lon_min, lon_max
+_REGION_NAMES = np.array(list(REGIONS))
+_REGION_LAT = np.radians([c[0] for c in REGIONS.values()])
+_REGION_LON = np.radians([c[1] for c in REGIONS.values()])
+
+
+def _plain(text: str) -> str:
+    """`text` without emoji and punctuation. Telugu vowel signs and viramas (Mn/Mc) stay;
+    a `[^\w\s]` filter would strip them, turning "బతుకమ్మ" into "బతకమమ"."""
+    kept = (ch for ch in unicodedata.normalize("NFC", text)
+            if unicodedata.category(ch)[0] != "P" and unicodedata.category(ch) not in ("So", "Sk")
+            and ch not in "\ufe0e\ufe0f")  # emoji variation selectors
+    return " ".join("".join(kept).split())
+
+
+def _festival_matcher() -> tuple[re.Pattern, dict[str, str]]:
+    names: dict[str, str] = {}
+    for item in CATALOG:
+        for text in (item["en"], item["te"], item["slug"].replace("_", " "), *FESTIVAL_ALIASES.get(item["slug"], ())):
+            name = _plain(text).lower()
+            if name:
+                names[name] = item["slug"]
+    # Longest first, so "sri rama navami" wins over "rama navami".
+    alternation = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    return re.compile(f"({alternation})"), names
+
+
+_FESTIVAL_RE, _FESTIVAL_NAMES = _festival_matcher()
+
+
+def dimensions(df: pd.DataFrame) -> pd.DataFrame:
+    """Dimension values for snapshot rows, indexed by record id."""
+    text = (df["title"].fillna("") + " " + df["description"].fillna("")).str.lower()
+    festival = text.str.extract(_FESTIVAL_RE, expand=False).map(_FESTIVAL_NAMES).fillna("other")
+
+    stamp = pd.to_datetime(df["created_at"].fillna(df["updated_at"]), utc=True, errors="coerce", format="ISO8601")
+    ym = stamp.dt.year * 100 + stamp.dt.month  # formatting only the distinct months is far cheaper than strftime
+    month = ym.map({v: f"{int(v) // 100:04d}-{int(v) % 100:02d}" for v in ym.dropna().unique()}).fillna(UNKNOWN)
+
+    lat = pd.to_numeric(df["latitude"], errors="coerce").to_numpy(float)
+    lon = pd.to_numeric(df["longitude"], errors="coerce").to_numpy(float)
+    region = np.full(len(df), "Not geotagged", dtype=object)
+    tagged = ~(np.isnan(lat) | np.isnan(lon))
+    inside = tagged & (lat >= _INDIA[0]) & (lat <= _INDIA[1]) & (lon >= _INDIA[2]) & (lon <= _INDIA[3])
+    region[tagged & ~inside] = "Outside India"
+    if inside.any():
+        la, lo = np.radians(lat[inside])[:, None], np.radians(lon[inside])[:, None]
+        d2 = (la - _REGION_LAT) ** 2 + ((lo - _REGION_LON) * np.cos(la)) ** 2
+        region[inside] = _REGION_NAMES[d2.argmin(axis=1)]
+
+    return pd.DataFrame({
+        "festival": festival.to_numpy(),
+        "month": month.to_numpy(),
+        "region": region,
+        "category_id": df["category_id"].fillna(UNKNOWN).to_numpy(),
+        "language": df["language"].fillna("").str.strip().str.lower().replace("", UNKNOWN).to_numpy(),
+        "release_rights": df["release_rights"].fillna(UNKNOWN).to_numpy(),
+    }, index=pd.Index(df["id"].to_numpy(), name="id"))
+
+
+def _empty_cube() -> pd.Series:
+    return pd.Series(dtype="int64", index=pd.MultiIndex.from_arrays([[]] * len(DIMENSIONS), names=DIMENSIONS))
+
+
+def _count(dims: pd.DataFrame) -> pd.Series:
+    return dims.groupby(DIMENSIONS, sort=False).size() if len(dims) else _empty_cube()
+
+
+class Rollups:
+    def __init__(self, root: str = ROLLUP_DIR):
+        self.root = root
+        self._lock = threading.RLock()
+        self._state_path = os.path.join(root, "state.json")
+        self.state = _read_json(self._state_path)
+        if self.state.get("format") != ROLLUP_FORMAT:
+            self.state = {"applied": [], "version": self.state.get("version", 0), "format": ROLLUP_FORMAT}
+        self.dims, self.cube = self._load()
+
+    def _load(self) -> tuple[pd.DataFrame, pd.Series]:
+        empty = pd.DataFrame(columns=DIMENSIONS, index=pd.Index([], name="id"), dtype=object)
+        try:
+            dims = pd.read_parquet(os.path.join(self.root, "dims.parquet"))
+            cube = pd.read_parquet(os.path.join(self.root, "cube.parquet")).set_index(DIMENSIONS)["count"]
+            return dims, cube
+        except Exception:
+            self.state = {"applied": [], "version": 0, "format": ROLLUP_FORMAT}
+            return empty, _empty_cube()
+
+    def _save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        for name, frame in (("dims", self.dims), ("cube", self.cube.rename("count").reset_index())):
+            tmp = os.path.join(self.root, f"{name}.parquet.tmp")
+            frame.to_parquet(tmp)
+            os.replace(tmp, os.path.join(self.root, f"{name}.parquet"))
+        _write_json(self._state_path, self.state)
+
+    @property
+    def version(self) -> int:
+        return self.state["version"]
+
+    def update(self, snap) -> bool:
+        """Fold snapshot files not yet applied into the rollups; False if nothing changed."""
+        import pyarrow.parquet as pq
+
+        with self._lock:
+            st = snap.state()
+            files = ([st["base"]] if st["base"] else []) + st["deltas"]
+            todo = [f for f in files if f not in set(self.state["applied"])]
+            if not todo:
+                return False
+            for name in todo:
+                try:
+                    table = pq.read_table(os.path.join(snap.root, name), columns=SOURCE_COLUMNS, memory_map=True)
+                except FileNotFoundError:
+                    continue  # compacted away meanwhile; its rows are in the new base
+                self._upsert(dimensions(table.to_pandas().drop_duplicates("id", keep="last")))
+            self.state = {"applied": files, "version": self.state["version"] + 1, "format": ROLLUP_FORMAT}
+            self._save()
+            return True
+
+    def _upsert(self, new: pd.DataFrame) -> None:
+        old = self.dims.reindex(new.index).dropna(how="all")
+        same = (old == new.loc[old.index]).all(axis=1)
+        changed_old = old[~same]
+        fresh = new.drop(index=old.index[same])
+        if not len(fresh):
+            return
+        cube = self.cube.add(_count(fresh), fill_value=0).sub(_count(changed_old), fill_value=0)
+        self.cube = cube[cube > 0].astype("int64")
+        self.dims = pd.concat([self.dims.drop(index=fresh.index, errors="ignore"), fresh])
+
+    # --------------- queries (all from the cube) ---------------
+    def total(self) -> int:
+        return int(self.cube.sum())
+
+    def counts(self, dim: str) -> pd.Series:
+        """Records per value of one dimension, largest first."""
+        if not len(self.cube):
+            return pd.Series(dtype="int64")
+        return self.cube.groupby(level=dim).sum().sort_values(ascending=False)
+
+    def trend(self, by: str | None = None, top: int = 5) -> pd.DataFrame:
+        """Monthly counts (columns: month, count[, by]); `by` keeps its `top` values, the rest become "other"."""
+        if not len(self.cube):
+            return pd.DataFrame(columns=["month", "count"] + ([by] if by else []))
+        c = self.cube[self.cube.index.get_level_values("month") != UNKNOWN]
+        if by is None:
+            return c.groupby(level="month").sum().rename("count").reset_index()
+        keep = set(self.counts(by).head(top).index)
+        df = c.rename("count").reset_index()
+        df[by] = df[by].where(df[by].isin(keep), "other")
+        return df.groupby(["month", by], as_index=False)["count"].sum()
+
+
+_shared: Rollups | None = None
+_shared_lock = threading.Lock()
+
+
+def rollups() -> Rollups:
+    """Process-wide rollups (loaded from disk on first use)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Rollups()
+        return _shared
@@ -1,6 +1,15 @@
 ﻿# utils/api_client.py
 from __future__ import annotations
-import os, requests
+import base64, copy, hashlib, http.cookiejar, json, os, tempfile, threading, time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.breaker import breaker_for, failed
+from utils.catalog import CATALOG, festival_view
+from utils.metrics import METRICS
+from utils.search import festival_index
 
 # ---- defaults from env; safe even if config.settings is missing
 API_BASE = os.getenv("API_BASE", "https://api.corpus.swecha.org").rstrip("/")
@@ -19,20 +28,330 @@ try:  # optional, safe
 except Exception:
     pass
 
+# ---- on-disk cache for things worth remembering across processes
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"))
+LOGIN_ROUTE_TTL = float(os.getenv("LOGIN_ROUTE_TTL", "86400"))  # seconds
+_LOGIN_ROUTE_FILE = os.path.join(CACHE_DIR, "login_route.json")
+
+# Candidate login endpoints in preference order: (path, payload style)
+_LOGIN_ATTEMPTS = [
+    # OAuth2-style token endpoints (form)
+    ("auth/token", "form"),
+    ("oauth/token", "form"),
+    ("token", "form"),
+    ("api/token", "form"),
+    # JWT endpoints (json)
+    ("auth/jwt/create", "json"),
+    ("auth/token/login", "json"),
+    # Plain login (json)
+    ("auth/login", "json"),
+    ("users/login", "json"),
+    ("sessions", "json"),
+    ("login", "json"),
+]
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _write_json(path: str, data: dict) -> None:
+    """Atomic write so concurrent server processes never see a half-written file."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+    except Exception:
+        pass  # cache is best-effort
+
+
+def _load_login_route(api_base: str) -> tuple[str, str] | None:
+    entry = _read_json(_LOGIN_ROUTE_FILE).get(api_base)
+    if not isinstance(entry, dict):
+        return None
+    if time.time() - float(entry.get("ts", 0)) > LOGIN_ROUTE_TTL:
+        return None
+    if (entry.get("path"), entry.get("style")) not in _LOGIN_ATTEMPTS:
+        return None
+    return entry["path"], entry["style"]
+
+
+def _save_login_route(api_base: str, route: tuple[str, str] | None) -> None:
+    data = _read_json(_LOGIN_ROUTE_FILE)
+    if route is None:
+        if data.pop(api_base, None) is None:
+            return
+    else:
+        data[api_base] = {"path": route[0], "style": route[1], "ts": time.time()}
+    _write_json(_LOGIN_ROUTE_FILE, data)
+
+
+def _login_kwargs(style: str, username: str, password: str) -> dict:
+    body = {"username": username, "password": password}
+    if style == "form":
+        return {"data": {**body, "grant_type": "password"}}
+    return {"json": body}
+
+
+def _token_from(resp) -> str | None:
+    if not isinstance(resp, dict):
+        return None
+    return resp.get("access_token") or resp.get("token") or resp.get("jwt") or resp.get("key")
+
+
+def _login_error(tried: list[str]) -> RuntimeError:
+    # summarize error
+    first_codes = [t.split()[0] for t in tried if t]
+    all_missing = first_codes and all(c in ("404", "405") for c in first_codes)
+    if first_codes and all(c == "0" for c in first_codes):
+        msg = "The corpus API is not reachable right now. Please try again in a little while."
+    elif all_missing:
+        msg = "Login endpoint not found on API."
+    else:
+        msg = "Invalid credentials or server rejected the request."
+    return RuntimeError(f"{msg} · Tried: " + " | ".join(tried))
+
+
+# ---- identity cache: token hash -> /me payload, so reruns don't re-probe the API
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "1024"))
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "300"))  # seconds, for non-JWT tokens
+
+
+def _jwt_exp(token: str) -> float | None:
+    """`exp` claim of a JWT (signature is not checked), or None for opaque tokens."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except Exception:
+        return None
+
+
+class _IdentityCache:
+    """Bounded LRU of verified identities keyed by a hash of the bearer token."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            expires, me = hit
+            if expires <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return dict(me)
+
+    def put(self, token: str, me: dict) -> None:
+        key, expires = self._key(token), _jwt_exp(token) or time.time() + IDENTITY_CACHE_TTL
+        with self._lock:
+            self._data[key] = (expires, dict(me))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def drop(self, token: str) -> None:
+        with self._lock:
+            self._data.pop(self._key(token), None)
+
+
+_IDENTITIES = _IdentityCache(IDENTITY_CACHE_SIZE)
+
+
+# ---- shared HTTP response cache for GETs (see utils/http_cache.py); 0 bytes disables it
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def _shared_http_cache():
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            from utils.http_cache import HTTP_CACHE_MAX_BYTES, HTTPCache
+            try:
+                _http_cache = HTTPCache() if HTTP_CACHE_MAX_BYTES > 0 else False
+            except Exception:
+                _http_cache = False  # unwritable cache dir etc.; run uncached
+        return _http_cache or None
+
+
+# ---- one tuned transport per process; clients are per-user handles over it
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "8"))    # hosts with a kept-alive pool
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))     # idle connections kept per host
+CLIENT_HANDLES = int(os.getenv("CLIENT_HANDLES", "1024"))   # per-session clients kept (LRU)
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "20"))          # cap for any single request, seconds
+_transport: requests.Session | None = None
+_transport_lock = threading.Lock()
+
+
+def shared_transport() -> requests.Session:
+    """Process-wide session with a bounded keep-alive pool per host.
+
+    It never holds credentials: no default auth header, and the cookie jar refuses
+    everything, so concurrent users can share its connections safely.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+            _transport = s
+        return _transport
+
+
+# ---- single-flight: identical concurrent GETs share one upstream call
+class _Call:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class _SingleFlight:
+    """Callers arriving while an identical call is running wait for it and share its result."""
+
+    def __init__(self):
+        self._calls: dict[tuple, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0    # calls that actually ran
+        self.shared = 0     # callers served by someone else's call
+
+    def do(self, key: tuple, fn, timeout: float | None = None):
+        """`fn()` once per key at a time; returns (result, shared). Followers get a deep copy.
+
+        A follower that gives up after `timeout` seconds gets (None, True).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                call.result = fn()
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+        if not call.done.wait(timeout):
+            return None, True
+        return copy.deepcopy(call.result), True  # callers may mutate what they get back
+
+
+_INFLIGHT = _SingleFlight()
+
+
+def _freeze(value) -> tuple:
+    return tuple(sorted((str(k), str(v)) for k, v in (value or {}).items()))
+
+
+# ---- latency budgets: seconds one high-level call may take across all its probes
+BUDGETS = {name: float(os.getenv(f"API_BUDGET_{name.upper()}", default)) for name, default in (
+    ("login", "10"), ("read_users_me", "5"), ("get_categories", "5"),
+    ("create_record", "15"), ("upload_chunk", "60"), ("list_records", "10"),
+)}
+
+
+def _decode(content: bytes):
+    try:
+        return json.loads(content)
+    except Exception:
+        return content.decode("utf-8", "replace")
+
 
 class SwechaAPIClient:
-    def __init__(self, api_base: str | None = None):
+    """Handle carrying one user's token; connections come from `shared_transport()`."""
+
+    def __init__(self, api_base: str | None = None, *, session: requests.Session | None = None):
         self.api_base = (api_base or API_BASE).rstrip("/")
-        self.session = requests.Session()
+        self.session = session or shared_transport()
+        self.headers: dict[str, str] = {}  # per-handle; the session's own headers stay credential-free
         self.token: str | None = API_TOKEN or None
         if self.token:
-            self.session.headers["Authorization"] = f"Bearer {self.token}"
+            self.headers["Authorization"] = f"Bearer {self.token}"
+        self._records_path: str | None = None  # listing endpoint, once one has answered
+        self._upload_path: str | None = None   # chunk upload endpoint, likewise
+        self.http_cache = _shared_http_cache()
+        self.breaker = breaker_for(self.api_base)  # shared by every client talking to this host
+
+    @property
+    def auth_scope(self) -> str | None:
+        """Short hash of the token, for keying caches per user."""
+        return hashlib.sha256(self.token.encode()).hexdigest()[:16] if self.token else None
 
     # --------------- helpers ---------------
-    def _request(self, method: str, path: str, **kwargs):
-        url = f"{self.api_base}/{path.lstrip('/')}"
+    @staticmethod
+    def _until(name: str, seconds: float | None) -> float:
+        """Absolute (monotonic) deadline for a call to `name`, from its budget unless given."""
+        return time.monotonic() + (BUDGETS[name] if seconds is None else seconds)
+
+    def _send(self, method: str, path: str, *, deadline: float | None = None, **kwargs) -> requests.Response:
+        """One upstream request, timed into METRICS under its endpoint path.
+
+        Raises CircuitOpen without touching the network while the host's breaker is
+        open, and TimeoutError once `deadline` has passed.
+        """
+        headers = {**self.headers, **(kwargs.pop("headers", None) or {})}
+        timeout = API_TIMEOUT if deadline is None else min(API_TIMEOUT, deadline - time.monotonic())
+        if timeout <= 0:
+            raise TimeoutError(f"latency budget spent before {method} /{path}")
+        self.breaker.check()
+        started = time.perf_counter()
         try:
-            r = self.session.request(method, url, timeout=20, **kwargs)
+            r = self.session.request(method, f"{self.api_base}/{path}", timeout=timeout, headers=headers, **kwargs)
+        except Exception:
+            self.breaker.record(False)
+            METRICS.observe(method, path, 0, time.perf_counter() - started)
+            raise
+        self.breaker.record(not failed(r.status_code))
+        METRICS.observe(method, path, r.status_code, time.perf_counter() - started)
+        return r
+
+    def _request(self, method: str, path: str, *, deadline: float | None = None, **kwargs):
+        path = path.lstrip("/")
+        if method.upper() == "GET":
+            # Same URL, params, headers and user: one upstream call however many sessions ask at once.
+            key = (self.api_base, path, _freeze(kwargs.get("params")), _freeze(kwargs.get("headers")), self.auth_scope)
+            wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+            result, shared = _INFLIGHT.do(key, lambda: self._get(path, deadline=deadline, **kwargs), wait)
+            if shared:
+                METRICS.coalesced("GET", path)
+            return result if result is not None else (0, {"error": "latency budget spent waiting for a shared request"})
+        return self._call(method, path, deadline=deadline, **kwargs)
+
+    def _get(self, path: str, **kwargs):
+        if self.http_cache is not None:
+            return self._cached_get(path, **kwargs)
+        return self._call("GET", path, **kwargs)
+
+    def _call(self, method: str, path: str, **kwargs):
+        try:
+            r = self._send(method, path, **kwargs)
             try:
                 body = r.json()
             except Exception:
@@ -41,71 +360,132 @@ class SwechaAPIClient:
         except Exception as e:
             return 0, {"error": str(e)}
 
+    def _cached_get(self, path: str, *, deadline: float | None = None, **kwargs):
+        """GET through the shared disk cache: fresh hits skip the network, stale ones revalidate.
+
+        When the request can't be made (breaker open, budget spent, network error), a
+        stale entry is served rather than nothing.
+        """
+        from utils.http_cache import cache_key, freshness
+
+        cache = self.http_cache
+        key = cache_key(f"{self.api_base}/{path}", kwargs.get("params"), self.auth_scope)
+        try:
+            entry = cache.get(key)
+        except Exception:
+            entry = None
+        if entry and entry["expires"] > time.time():
+            METRICS.cache_hit("GET", path)
+            return 200, _decode(entry["body"])
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            r = self._send("GET", path, deadline=deadline, headers=headers, **kwargs)
+        except Exception as e:
+            if entry:
+                METRICS.cache_hit("GET", path)
+                return 200, _decode(entry["body"])
+            return 0, {"error": str(e)}
+
+        try:
+            if r.status_code == 304 and entry:
+                cache.refresh(key, freshness(r.headers) or 0.0)
+                return 200, _decode(entry["body"])
+            if r.status_code == 200:
+                ttl = freshness(r.headers)
+                etag, modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+                if ttl is not None and (ttl > 0 or etag or modified):
+                    cache.put(key, r.content, etag=etag, last_modified=modified, ttl=ttl)
+        except Exception:
+            pass  # caching is best-effort
+        return r.status_code, _decode(r.content)
+
     def set_auth_token(self, token: str) -> None:
         self.token = token
-        self.session.headers["Authorization"] = f"Bearer {token}"
+        self.headers["Authorization"] = f"Bearer {token}"
 
     def set_token_and_verify(self, token: str) -> bool:
         self.set_auth_token(token)
         return bool(self.read_users_me())
 
+    def logout(self, token: str | None = None) -> None:
+        """Forget the cached identity for `token` (default: the current one)."""
+        token = token or self.token
+        if token:
+            _IDENTITIES.drop(token)
+        if token and token == self.token:
+            self.token = None
+            self.headers.pop("Authorization", None)
+
     # --------------- auth ---------------
-    def login(self, username_or_phone: str, password: str) -> dict | None:
-        """Password login. In DEMO mode accepts any username with password 'demo123'."""
+    def login(self, username_or_phone: str, password: str, *, deadline: float | None = None) -> dict | None:
+        """Password login. In DEMO mode accepts any username with password 'demo123'.
+
+        `deadline` (seconds, default BUDGETS["login"]) covers discovery and the login itself.
+        """
         if DEMO_MODE:
             if password == "demo123":
                 return {"access_token": "demo-token", "user": {"username": username_or_phone}}
             return None
+        until = self._until("login", deadline)
 
-        # Try common endpoints/payloads used by typical backends.
-        attempts = [
-            # OAuth2-style token endpoints (form)
-            ("auth/token", {"username": username_or_phone, "password": password, "grant_type": "password"}, "form"),
-            ("oauth/token", {"username": username_or_phone, "password": password, "grant_type": "password"}, "form"),
-            ("token", {"username": username_or_phone, "password": password, "grant_type": "password"}, "form"),
-            ("api/token", {"username": username_or_phone, "password": password, "grant_type": "password"}, "form"),
-            # JWT endpoints (json)
-            ("auth/jwt/create", {"username": username_or_phone, "password": password}, "json"),
-            ("auth/token/login", {"username": username_or_phone, "password": password}, "json"),
-            # Plain login (json)
-            ("auth/login", {"username": username_or_phone, "password": password}, "json"),
-            ("users/login", {"username": username_or_phone, "password": password}, "json"),
-            ("sessions", {"username": username_or_phone, "password": password}, "json"),
-            ("login", {"username": username_or_phone, "password": password}, "json"),
-        ]
-
-        tried = []
-        for path, body, style in attempts:
-            kwargs = {"data": body} if style == "form" else {"json": body}
-            sc, resp = self._request("POST", path, **kwargs)
-            tried.append(f"{sc} {path} ({style} {','.join(body.keys())})")
-
-            if sc == 200 and isinstance(resp, dict):
-                token = (
-                    resp.get("access_token")
-                    or resp.get("token")
-                    or resp.get("jwt")
-                    or resp.get("key")
-                )
-                if token:
-                    self.set_auth_token(token)
-                    return {"access_token": token}
+        # Fast path: the endpoint discovered earlier (possibly by another process).
+        route = _load_login_route(self.api_base)
+        if route:
+            path, style = route
+            sc, resp = self._request("POST", path, deadline=until, **_login_kwargs(style, username_or_phone, password))
+            if sc not in (404, 405):
+                return self._finish_login(sc, resp, [f"{sc} {path} ({style} cached)"])
+            _save_login_route(self.api_base, None)  # endpoint moved; rediscover
+
+        return self._discover_login(username_or_phone, password, until)
 
-            if sc in (401, 403):
-                break  # server exists & rejected creds; stop trying other shapes
+    def _discover_login(self, username_or_phone: str, password: str, until: float) -> dict | None:
+        """Probe every candidate endpoint concurrently and remember the one that answers."""
+        def probe(attempt):
+            path, style = attempt
+            return self._request("POST", path, deadline=until, **_login_kwargs(style, username_or_phone, password))
 
-        # summarize error
-        first_codes = [t.split()[0] for t in tried if t]
-        all_missing = first_codes and all(c in ("404", "405") for c in first_codes)
-        msg = "Login endpoint not found on API." if all_missing else "Invalid credentials or server rejected the request."
-        raise RuntimeError(f"{msg} · Tried: " + " | ".join(tried))
+        with ThreadPoolExecutor(max_workers=len(_LOGIN_ATTEMPTS)) as pool:
+            results = list(pool.map(probe, _LOGIN_ATTEMPTS))
 
-    def read_users_me(self) -> dict | None:
+        tried = [f"{sc} {path} ({style})" for (path, style), (sc, _) in zip(_LOGIN_ATTEMPTS, results)]
+        # First endpoint (in preference order) that issued a token or rejected the creds is the real one.
+        for attempt, (sc, resp) in zip(_LOGIN_ATTEMPTS, results):
+            if (sc == 200 and _token_from(resp)) or sc in (401, 403):
+                _save_login_route(self.api_base, attempt)
+                return self._finish_login(sc, resp, tried)
+        return self._finish_login(0, None, tried)
+
+    def _finish_login(self, sc: int, resp, tried: list[str]) -> dict | None:
+        token = _token_from(resp) if sc == 200 else None
+        if token:
+            self.set_auth_token(token)
+            return {"access_token": token}
+        raise _login_error(tried)
+
+    def read_users_me(self, *, deadline: float | None = None) -> dict | None:
         if DEMO_MODE:
             return {"full_name": "Demo User"}
+        token = self.token
+        if token:
+            exp = _jwt_exp(token)
+            if exp is not None and exp <= time.time():
+                _IDENTITIES.drop(token)
+                return None  # expired JWT; no point asking the server
+            me = _IDENTITIES.get(token)
+            if me is not None:
+                return me
+        until = self._until("read_users_me", deadline)
         for p in ("auth/me", "users/me", "me", "profile", "api/me"):
-            sc, body = self._request("GET", p)
+            sc, body = self._request("GET", p, deadline=until)
             if sc == 200 and isinstance(body, dict):
+                if token:
+                    _IDENTITIES.put(token, body)
                 return body
         return None
 
@@ -123,21 +503,129 @@ class SwechaAPIClient:
         return False
 
     # --------------- data ---------------
-    def get_categories(self):
+    def get_categories(self, *, deadline: float | None = None):
         if DEMO_MODE:
             return [{"id": 1, "name": "Festivals"}]
+        until = self._until("get_categories", deadline)
         for p in ("categories", "api/categories", "records/categories"):
-            sc, body = self._request("GET", p)
+            sc, body = self._request("GET", p, deadline=until)
             if sc == 200:
                 return body
         return []
 
-    def create_record(self, **payload):
+    def create_record(self, *, deadline: float | None = None, idempotency_key: str | None = None, **payload):
         if DEMO_MODE:
             # pretend success
             return {"id": 1, "demo": True, **payload}
+        until = self._until("create_record", deadline)
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
         for p in ("records", "api/records", "items"):
-            sc, body = self._request("POST", p, json=payload)
+            sc, body = self._request("POST", p, deadline=until, json=payload, headers=headers)
             if sc in (200, 201) and isinstance(body, dict):
                 return body
         return None
+
+    def upload_chunk(self, *, upload_uuid: str, filename: str, chunk_index: int, total_chunks: int,
+                     data: bytes, deadline: float | None = None) -> bool:
+        """Send one piece of a chunked media upload as multipart form data."""
+        if DEMO_MODE:
+            return True
+        form = {"upload_uuid": upload_uuid, "filename": filename,
+                "chunk_index": str(chunk_index), "total_chunks": str(total_chunks)}
+        files = {"chunk": (filename, data, "application/octet-stream")}
+        until = self._until("upload_chunk", deadline)
+        paths = [self._upload_path] if self._upload_path else ["records/upload/chunk", "api/records/upload/chunk"]
+        for p in paths:
+            sc, _ = self._request("POST", p, deadline=until, data=form, files=files)
+            if sc in (200, 201):
+                self._upload_path = p
+                return True
+            if sc not in (404, 405):
+                return False
+        return False
+
+    def list_records(self, cursor: str | None = None, limit: int = 20, updated_since: str | None = None,
+                     *, deadline: float | None = None) -> tuple[list[dict], str | None]:
+        """One page of corpus records plus the cursor of the next page (None at the end).
+
+        Follows the API's own cursor when it returns one, otherwise pages with skip/limit.
+        `updated_since` (ISO 8601) asks for records changed since then; APIs may ignore it.
+        """
+        offset = int(cursor[len("offset:"):]) if cursor and cursor.startswith("offset:") else None
+        if DEMO_MODE:
+            start = offset or 0
+            demo = [{"id": i + 1, "title": it["en"], "description": it["desc_en"], "language": "telugu",
+                     "release_rights": "CC BY-SA 4.0"} for i, it in enumerate(CATALOG)]
+            page = demo[start:start + limit]
+            return page, (f"offset:{start + limit}" if start + limit < len(demo) else None)
+
+        params = {"limit": limit}
+        if updated_since:
+            params["updated_since"] = updated_since
+        if offset is not None:
+            params.update(skip=offset, offset=offset)
+        elif cursor:
+            params["cursor"] = cursor
+        until = self._until("list_records", deadline)
+        paths = [self._records_path] if self._records_path else ["records", "api/records", "items"]
+        for p in paths:
+            sc, body = self._request("GET", p, deadline=until, params=params)
+            if sc != 200:
+                continue
+            self._records_path = p
+            cursor_paged = False  # API answers with its own cursor; null then means "last page"
+            if isinstance(body, dict):
+                items = next((body[k] for k in ("items", "results", "data", "records") if isinstance(body.get(k), list)), [])
+                nxt = body.get("next_cursor") or body.get("cursor") or body.get("next")
+                cursor_paged = any(k in body for k in ("next_cursor", "cursor", "next"))
+                if isinstance(nxt, str) and nxt.startswith(("http://", "https://")):
+                    nxt, cursor_paged = None, False  # a next-page URL, not a cursor; page by offset instead
+            else:
+                items, nxt = (body if isinstance(body, list) else []), None
+            if not nxt and not cursor_paged and len(items) >= limit:
+                nxt = f"offset:{(offset or 0) + len(items)}"
+            return items, (str(nxt) if nxt else None)
+        return [], None
+
+    # --------------- festivals ---------------
+    def get_festivals(self) -> list[dict]:
+        """Festival catalog. The corpus API has no festival endpoint, so this is served locally."""
+        return [festival_view(item) for item in CATALOG]
+
+    def search_festivals(self, q: str, limit: int = 20) -> list[dict]:
+        """English / Telugu / transliterated search over the festival catalog."""
+        return [festival_view(doc) for _, doc, _ in festival_index().search(q, limit)]
+
+
+class _ClientPool:
+    """Bounded LRU of client handles keyed by browser session (or any caller key)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, SwechaAPIClient] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> SwechaAPIClient:
+        with self._lock:
+            client = self._data.get(key)
+            if client is None:
+                client = self._data[key] = SwechaAPIClient()
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)  # nothing to close; the transport is shared
+            return client
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_CLIENTS = _ClientPool(CLIENT_HANDLES)
+
+
+def client_for(key: str) -> SwechaAPIClient:
+    """The client handle for `key` (e.g. a Streamlit session id), created on first use."""
+    return _CLIENTS.get(key)
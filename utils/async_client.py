@@ -0,0 +1,214 @@
+# utils/async_client.py
+from __future__ import annotations
+import asyncio, os, random, time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.api_client import (
+    API_BASE, API_TOKEN, DEMO_MODE, _IDENTITIES, _LOGIN_ATTEMPTS,
+    _jwt_exp, _load_login_route, _login_error, _login_kwargs, _save_login_route, _token_from,
+)
+from utils.breaker import CircuitOpen, breaker_for, failed
+from utils.metrics import METRICS
+
+# ---- tuning knobs (env), all overridable per instance
+ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", "64"))      # pooled connections / worker threads
+ASYNC_PER_HOST = int(os.getenv("ASYNC_PER_HOST", "16"))        # concurrent requests per host
+ASYNC_RETRIES = int(os.getenv("ASYNC_RETRIES", "3"))
+ASYNC_BACKOFF = float(os.getenv("ASYNC_BACKOFF", "0.25"))      # base delay, seconds
+ASYNC_BACKOFF_CAP = float(os.getenv("ASYNC_BACKOFF_CAP", "5"))
+ASYNC_DEADLINE = float(os.getenv("ASYNC_DEADLINE", "20"))      # default budget per high-level call
+
+_IDEMPOTENT = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class AsyncSwechaAPIClient:
+    """asyncio sibling of SwechaAPIClient for batch tools and background workers.
+
+    Requests run on a bounded thread pool over one pooled `requests` session, so the
+    whole stack stays on the app's existing dependencies. Every high-level method takes
+    an optional `deadline` (seconds) covering all of its probes and retries.
+    """
+
+    def __init__(
+        self,
+        api_base: str | None = None,
+        *,
+        pool_size: int = ASYNC_POOL_SIZE,
+        per_host: int = ASYNC_PER_HOST,
+        retries: int = ASYNC_RETRIES,
+        backoff: float = ASYNC_BACKOFF,
+        backoff_cap: float = ASYNC_BACKOFF_CAP,
+        deadline: float = ASYNC_DEADLINE,
+    ):
+        self.api_base = (api_base or API_BASE).rstrip("/")
+        self.per_host, self.retries = per_host, retries
+        self.backoff, self.backoff_cap, self.deadline = backoff, backoff_cap, deadline
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="swecha-async")
+        self._host_sems: dict[str, asyncio.Semaphore] = {}
+        self.breaker = breaker_for(self.api_base)  # the same per-host breaker the sync client uses
+        self.token: str | None = API_TOKEN or None
+        if self.token:
+            self.session.headers["Authorization"] = f"Bearer {self.token}"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    # --------------- helpers ---------------
+    def _send(self, method: str, path: str, timeout: float, kwargs: dict):
+        try:
+            self.breaker.check()
+        except CircuitOpen as e:
+            return 0, {"error": str(e), "circuit_open": True}
+        started = time.perf_counter()
+        try:
+            r = self.session.request(method, f"{self.api_base}/{path}", timeout=timeout, **kwargs)
+        except Exception as e:
+            self.breaker.record(False)
+            METRICS.observe(method, path, 0, time.perf_counter() - started)
+            return 0, {"error": str(e)}
+        self.breaker.record(not failed(r.status_code))
+        METRICS.observe(method, path, r.status_code, time.perf_counter() - started)
+        try:
+            return r.status_code, r.json()
+        except Exception:
+            return r.status_code, r.text
+
+    def _deadline(self, seconds: float | None) -> float:
+        return asyncio.get_running_loop().time() + (self.deadline if seconds is None else seconds)
+
+    async def _request(self, method: str, path: str, *, deadline: float | None = None,
+                       retry: bool | None = None, **kwargs):
+        """Like SwechaAPIClient._request, plus per-host concurrency, backoff and a deadline.
+
+        `deadline` is an absolute loop time. 5xx and connection errors are retried with
+        full-jitter exponential backoff; non-idempotent methods only when `retry=True`.
+        Nothing is sent while the host's circuit breaker is open.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = deadline if deadline is not None else self._deadline(None)
+        path = path.lstrip("/")
+        sem = self._host_sems.setdefault(urlsplit(self.api_base).netloc, asyncio.Semaphore(self.per_host))
+        retry = method.upper() in _IDEMPOTENT if retry is None else retry
+
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return 0, {"error": "deadline exceeded"}
+            async with sem:
+                sc, body = await loop.run_in_executor(
+                    self._executor, self._send, method, path, max(remaining, 0.001), kwargs
+                )
+            if not retry or attempt >= self.retries or (sc != 0 and sc < 500):
+                return sc, body
+            if isinstance(body, dict) and body.get("circuit_open"):
+                return sc, body  # retrying can't help until the breaker lets a trial through
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff * 2 ** attempt))
+            if loop.time() + delay >= deadline:
+                return sc, body
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def set_auth_token(self, token: str) -> None:
+        self.token = token
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    # --------------- auth ---------------
+    async def login(self, username_or_phone: str, password: str, *, deadline: float | None = None) -> dict | None:
+        """Password login. In DEMO mode accepts any username with password 'demo123'."""
+        if DEMO_MODE:
+            if password == "demo123":
+                return {"access_token": "demo-token", "user": {"username": username_or_phone}}
+            return None
+
+        until = self._deadline(deadline)
+        route = _load_login_route(self.api_base)
+        if route:
+            path, style = route
+            sc, resp = await self._request("POST", path, deadline=until, retry=True,
+                                           **_login_kwargs(style, username_or_phone, password))
+            if sc not in (404, 405):
+                return self._finish_login(sc, resp, [f"{sc} {path} ({style} cached)"])
+            _save_login_route(self.api_base, None)
+
+        results = await asyncio.gather(*(
+            self._request("POST", path, deadline=until, retry=True,
+                          **_login_kwargs(style, username_or_phone, password))
+            for path, style in _LOGIN_ATTEMPTS
+        ))
+        tried = [f"{sc} {path} ({style})" for (path, style), (sc, _) in zip(_LOGIN_ATTEMPTS, results)]
+        for attempt, (sc, resp) in zip(_LOGIN_ATTEMPTS, results):
+            if (sc == 200 and _token_from(resp)) or sc in (401, 403):
+                _save_login_route(self.api_base, attempt)
+                return self._finish_login(sc, resp, tried)
+        return self._finish_login(0, None, tried)
+
+    def _finish_login(self, sc: int, resp, tried: list[str]) -> dict | None:
+        token = _token_from(resp) if sc == 200 else None
+        if token:
+            self.set_auth_token(token)
+            return {"access_token": token}
+        raise _login_error(tried)
+
+    async def read_users_me(self, *, deadline: float | None = None) -> dict | None:
+        if DEMO_MODE:
+            return {"full_name": "Demo User"}
+        token = self.token
+        if token:
+            exp = _jwt_exp(token)
+            if exp is not None and exp <= time.time():
+                _IDENTITIES.drop(token)
+                return None
+            me = _IDENTITIES.get(token)
+            if me is not None:
+                return me
+        body = await self._first_ok("GET", ("auth/me", "users/me", "me", "profile", "api/me"), deadline,
+                                    accept=lambda sc, b: sc == 200 and isinstance(b, dict))
+        if body is not None and token:
+            _IDENTITIES.put(token, body)
+        return body
+
+    # --------------- data ---------------
+    async def get_categories(self, *, deadline: float | None = None):
+        if DEMO_MODE:
+            return [{"id": 1, "name": "Festivals"}]
+        body = await self._first_ok("GET", ("categories", "api/categories", "records/categories"), deadline,
+                                    accept=lambda sc, b: sc == 200)
+        return [] if body is None else body
+
+    async def create_record(self, *, deadline: float | None = None, idempotency_key: str | None = None, **payload):
+        if DEMO_MODE:
+            return {"id": 1, "demo": True, **payload}
+        until = self._deadline(deadline)
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        # Sequential on purpose: probing writes in parallel could create the record twice.
+        # With an idempotency key the server can de-duplicate, so retries become safe.
+        for p in ("records", "api/records", "items"):
+            sc, body = await self._request("POST", p, deadline=until, retry=bool(idempotency_key),
+                                           json=payload, headers=headers)
+            if sc in (200, 201) and isinstance(body, dict):
+                return body
+        return None
+
+    async def _first_ok(self, method: str, paths, deadline: float | None, *, accept):
+        """Probe read-only `paths` concurrently; return the first acceptable body in path order."""
+        until = self._deadline(deadline)
+        results = await asyncio.gather(*(self._request(method, p, deadline=until) for p in paths))
+        for sc, body in results:
+            if accept(sc, body):
+                return body
+        return None
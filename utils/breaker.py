@@ -0,0 +1,102 @@
+# utils/breaker.py
+"""Per-host circuit breakers for the API clients.
+
+A breaker is closed while its host answers. After BREAKER_FAILURES failures in a row
+(connection errors, timeouts, 5xx), it opens and every request fails at once with
+CircuitOpen instead of waiting on the network. After BREAKER_RESET seconds it goes
+half-open: one trial request is let through. If that succeeds the breaker closes, and
+if it fails the breaker opens for another BREAKER_RESET seconds.
+"""
+from __future__ import annotations
+import os, threading, time
+from urllib.parse import urlsplit
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))     # consecutive failures that open it
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "30"))        # seconds open before a trial request
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(ConnectionError):
+    """Raised instead of sending a request to a host whose breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, host: str, failures: int = BREAKER_FAILURES, reset: float = BREAKER_RESET):
+        self.host, self.failures, self.reset = host, failures, reset
+        self._state = CLOSED
+        self._streak = 0           # consecutive failures
+        self._opened_at = 0.0
+        self._trial = False        # a half-open trial request is in flight
+        self.trips = 0             # times it has opened
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset:
+                return HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial request is allowed (0 unless open)."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Whether a request may go out now. In half-open state only one caller gets True."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at < self.reset:
+                return False
+            if self._trial:
+                return False
+            self._state, self._trial = HALF_OPEN, True
+            return True
+
+    def record(self, ok: bool) -> None:
+        """Outcome of a request that `allow()` let through."""
+        with self._lock:
+            self._trial = False
+            if ok:
+                self._state, self._streak = CLOSED, 0
+                return
+            self._streak += 1
+            if self._state == HALF_OPEN or self._streak >= self.failures:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state, self._opened_at = OPEN, time.monotonic()
+
+    def check(self) -> None:
+        """`allow()`, raising CircuitOpen when the request must not go out."""
+        if not self.allow():
+            raise CircuitOpen(f"{self.host} is failing; not retrying for {self.retry_in():.0f}s")
+
+
+def failed(status: int) -> bool:
+    """Whether a response status counts against the host (0 = no response)."""
+    return status == 0 or status >= 500
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(api_base: str) -> CircuitBreaker:
+    """The process-wide breaker for the host of `api_base`."""
+    host = urlsplit(api_base).netloc or api_base
+    with _breakers_lock:
+        b = _breakers.get(host)
+        if b is None:
+            b = _breakers[host] = CircuitBreaker(host)
+        return b
+
+
+def breakers() -> list[dict]:
+    """State of every breaker, for dashboards."""
+    with _breakers_lock:
+        items = list(_breakers.values())
+    return [{"host": b.host, "state": b.state, "trips": b.trips, "retry_in": round(b.retry_in(), 1)} for b in items]
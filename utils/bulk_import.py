@@ -0,0 +1,255 @@
+# utils/bulk_import.py
+"""Streaming bulk import of festival records from CSV or JSONL.
+
+    python -m utils.bulk_import archive.csv --concurrency 16
+
+Rows are read one at a time, validated with the Contribute form's rules and sent with
+bounded concurrency. Each row carries an idempotency key made of the file's fingerprint
+and its row number: the same on every resume, but never shared by two rows that happen
+to hold the same text. Progress is checkpointed so an interrupted import resumes
+instead of starting over. Rows that closely resemble a record already in the local snapshot, or an earlier row,
+are skipped (see utils/dedup.py).
+"""
+from __future__ import annotations
+import argparse, asyncio, csv, hashlib, io, json, os, sys, time
+from dataclasses import dataclass, field
+
+from utils.api_client import CACHE_DIR, _read_json, _write_json
+from utils.async_client import AsyncSwechaAPIClient
+from utils.dedup import DuplicateIndex
+from utils.records import build_record
+
+CHECKPOINT_EVERY = 100   # completed rows between checkpoint writes
+MAX_ERRORS_KEPT = 100
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    rejected: int = 0      # failed validation; never sent
+    failed: int = 0        # API did not accept; retried on resume
+    skipped: int = 0       # already done according to the checkpoint
+    duplicates: int = 0    # near-duplicates found; not sent unless skip_duplicates is off
+    seconds: float = 0.0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def note(self, row: int, reason: str) -> None:
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append((row, reason))
+
+
+class _Watermark:
+    """Highest row number below which every row is finished, despite out-of-order completion."""
+
+    def __init__(self, done: int):
+        self.done = done
+        self._ahead: set[int] = set()
+
+    def mark(self, row: int) -> None:
+        self._ahead.add(row)
+        while self.done + 1 in self._ahead:
+            self.done += 1
+            self._ahead.remove(self.done)
+
+
+def detect_format(name: str) -> str:
+    return "jsonl" if name.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def fingerprint(stream) -> str:
+    """Cheap identity of a seekable binary stream: size plus a hash of its first 64 KiB."""
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    head = stream.read(64 * 1024)
+    stream.seek(0)
+    return hashlib.sha256(head + str(size).encode()).hexdigest()[:32]
+
+
+def checkpoint_path_for(stream) -> str:
+    return os.path.join(CACHE_DIR, "imports", f"{fingerprint(stream)}.json")
+
+
+def iter_rows(stream, fmt: str):
+    """Yield `(row_number, row_dict | None, parse_error | None)` from a binary stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for n, row in enumerate(csv.DictReader(text), start=1):
+                yield n, row, None
+            return
+        n = 0
+        for line in text:
+            if not line.strip():
+                continue
+            n += 1
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield n, None, f"invalid JSON: {e}"
+                continue
+            yield (n, row, None) if isinstance(row, dict) else (n, None, "expected a JSON object")
+    finally:
+        text.detach()  # leave the caller's stream open
+
+
+async def import_records(
+    stream,
+    *,
+    client: AsyncSwechaAPIClient,
+    fmt: str = "csv",
+    concurrency: int = 8,
+    checkpoint: str | None = None,
+    dry_run: bool = False,
+    duplicates=None,
+    skip_duplicates: bool = True,
+    on_progress=None,
+) -> ImportReport:
+    """Import every row of `stream` (a seekable binary file) and return a report.
+
+    `checkpoint` is a JSON file path; when it matches this stream's fingerprint the
+    rows it covers are skipped, except those the API did not accept, which are sent
+    again. With `duplicates` (a DuplicateIndex), rows resembling
+    an indexed record or an earlier row are noted and, if `skip_duplicates`, not sent.
+    Rows are added to `duplicates` only while they are being sent, and removed again if
+    the API does not accept them. `on_progress(report)` is called as rows finish.
+    """
+    started = time.perf_counter()
+    report = ImportReport()
+    fp = fingerprint(stream)
+    state = _read_json(checkpoint) if checkpoint else {}
+    same = state.get("fingerprint") == fp
+    resume_after = int(state.get("done", 0)) if same else 0
+    retry = set(state.get("failed", [])) if same else set()  # below the watermark, but not delivered
+    failed = set(retry)
+    mark = _Watermark(resume_after)
+    since_save = 0
+
+    def save() -> None:
+        if checkpoint and not dry_run:
+            _write_json(checkpoint, {"fingerprint": fp, "done": mark.done, "failed": sorted(failed),
+                                     "updated": time.time()})
+
+    def finished(row: int, ok: bool) -> None:
+        nonlocal since_save
+        # Failed rows count as finished too, so one refusal doesn't hold the watermark back;
+        # they are listed in the checkpoint and sent again on resume.
+        if row > resume_after:
+            mark.mark(row)
+        (failed.discard if ok else failed.add)(row)
+        since_save += 1
+        if since_save >= CHECKPOINT_EVERY:
+            since_save = 0
+            save()
+        if on_progress:
+            on_progress(report)
+
+    slots = asyncio.Semaphore(concurrency)
+    inflight: set[asyncio.Task] = set()
+
+    # Rows of this file seen so far; a dry run keeps them out of the shared index.
+    local = DuplicateIndex() if dry_run and duplicates is not None else None
+
+    async def submit(row: int, payload: dict, key: str | None) -> None:
+        try:
+            rec = await client.create_record(idempotency_key=f"{fp}:{row}", **payload)
+        except Exception as e:
+            rec = None
+            report.note(row, str(e))
+        finally:
+            slots.release()
+        if rec:
+            report.created += 1
+        else:
+            report.failed += 1
+            report.note(row, "API did not accept the record.")
+            if key:
+                duplicates.remove(key)
+        finished(row, bool(rec))
+
+    for row, data, err in iter_rows(stream, fmt):
+        if row <= resume_after and row not in retry:
+            report.skipped += 1
+            continue
+        if data is None:
+            payload, problems = {}, [err]
+        else:
+            payload, problems = build_record(**{k: v for k, v in data.items() if isinstance(k, str)})
+        if problems:
+            report.rejected += 1
+            report.note(row, " ".join(problems))
+            finished(row, True)  # resending will not fix it
+            continue
+        key = None
+        if duplicates is not None:
+            key = f"import:{fp[:12]}:{row}"
+            similar = duplicates.similar(payload, limit=1, exclude=key) or (local.similar(payload, limit=1) if local else [])
+            if similar:
+                other, label, score = similar[0]
+                report.duplicates += 1
+                report.note(row, f"Near-duplicate of {label or other} ({score:.0%} similar).")
+                if skip_duplicates:
+                    finished(row, True)  # sending it would only add moderation work
+                    continue
+        if dry_run:
+            if local is not None:
+                local.add(key, payload)
+            report.created += 1
+            finished(row, True)
+            continue
+        await slots.acquire()  # bounds in-flight rows (and memory) to `concurrency`
+        if key:
+            duplicates.add(key, payload)  # later rows (and other users) see it while it is sent
+        task = asyncio.create_task(submit(row, payload, key))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+
+    if inflight:
+        await asyncio.gather(*inflight)
+    save()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m utils.bulk_import", description="Bulk import festival records.")
+    ap.add_argument("path", help="CSV (header row) or JSONL file")
+    ap.add_argument("--format", choices=("csv", "jsonl"), help="default: from file extension")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--checkpoint", help="checkpoint file (default: under CACHE_DIR/imports)")
+    ap.add_argument("--api-base", help="override API_BASE")
+    ap.add_argument("--token", default=os.getenv("API_TOKEN", ""), help="bearer token (default: $API_TOKEN)")
+    ap.add_argument("--dry-run", action="store_true", help="validate only; send nothing")
+    ap.add_argument("--duplicates", choices=("skip", "warn", "off"), default="skip",
+                    help="rows resembling a snapshot record or an earlier row: skip them, send with a note, "
+                         "or don't check (default: skip)")
+    args = ap.parse_args(argv)
+
+    index = None
+    if args.duplicates != "off":
+        from utils.dedup import duplicate_index
+        from utils.snapshot import snapshot
+        index = duplicate_index()
+        index.update(snapshot())
+
+    async def run() -> ImportReport:
+        with open(args.path, "rb") as fh:
+            async with AsyncSwechaAPIClient(args.api_base, per_host=args.concurrency) as client:
+                if args.token:
+                    client.set_auth_token(args.token)
+                return await import_records(
+                    fh, client=client, fmt=args.format or detect_format(args.path),
+                    concurrency=args.concurrency, checkpoint=args.checkpoint or checkpoint_path_for(fh),
+                    dry_run=args.dry_run, duplicates=index, skip_duplicates=args.duplicates == "skip",
+                )
+
+    report = asyncio.run(run())
+    for row, reason in report.errors:
+        print(f"row {row}: {reason}", file=sys.stderr)
+    print(f"created={report.created} rejected={report.rejected} failed={report.failed} "
+          f"skipped={report.skipped} duplicates={report.duplicates} seconds={report.seconds:.1f}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# utils/catalog.py
+from __future__ import annotations
+import os
+
+# Static festival catalog (local images), shared by Explore, search and the API client.
+ASSETS = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets"))
+IMG_DIR = os.path.join(ASSETS, "festivals")
+
+CATALOG = [
+    {
+        "slug": "bathukamma",
+        "img": os.path.join(IMG_DIR, "bathukamma.jpg"),
+        "en": "Bathukamma 🌼",
+        "te": "బతుకమ్మ 🌼",
+        "desc_en": "Flower festival celebrating life and sisterhood across Telangana.",
+        "desc_te": "దసరా ముందు తొమ్మిది రోజులు జరుపుకునే తెలంగాణ పుష్పాల పండుగ.",
+    },
+    {
+        "slug": "bonalu",
+        "img": os.path.join(IMG_DIR, "bonalu.jpg"),
+        "en": "Bonalu 🪔",
+        "te": "బోనాలు 🪔",
+        "desc_en": "Offerings to Mahankali with decorated pots, dances and drums.",
+        "desc_te": "మహాంకాళి అమ్మవారికి అలంకరించిన బొనాలతో నివేదనలు, డప్పులతో నృత్యాలు.",
+    },
+    {
+        "slug": "ugadi",
+        "img": os.path.join(IMG_DIR, "ugadi.jpg"),
+        "en": "Ugadi 🥭",
+        "te": "ఉగాది 🥭",
+        "desc_en": "Telugu New Year marked with ‘Ugadi Pachadi’—six tastes of life.",
+        "desc_te": "తెలుగు నూతన సంవత్సరం. ‘ఉగాది పచ్చడి’తో జీవన ఆరు రుచుల సందేశం.",
+    },
+    {
+        "slug": "sri_rama_navami",
+        "img": os.path.join(IMG_DIR, "sri_rama_navami.jpg"),
+        "en": "Sri Rama Navami 🏹",
+        "te": "శ్రీరామనవమి 🏹",
+        "desc_en": "Celebrates the birth of Lord Rama with kalyanam and prasadam.",
+        "desc_te": "శ్రీరామ జన్మోత్సవం. కల్యాణం, ప్రత్యేక పూజలు, ప్రసాదం.",
+    },
+    {
+        "slug": "vinayaka_chavithi",
+        "img": os.path.join(IMG_DIR, "vinayaka_chavithi.jpg"),
+        "en": "Vinayaka Chavithi 🐘",
+        "te": "వినాయక చవితి 🐘",
+        "desc_en": "Ganesh festival—install, worship and immerse Lord Ganesha.",
+        "desc_te": "గణేశుని ప్రతిష్ఠించుకుని పూజలతో ఘనంగా జరుపుకునే పండుగ.",
+    },
+    {
+        "slug": "navaratri",
+        "img": os.path.join(IMG_DIR, "navaratri.jpg"),
+        "en": "Navaratri ✨",
+        "te": "నవరాత్రి ✨",
+        "desc_en": "Nine nights of Devi worship, music and dance.",
+        "desc_te": "దేవీ ఉపాసన, సంగీత నృత్యాలతో తొమ్మిది రాత్రుల మహోత్సవం.",
+    },
+]
+
+
+def festival_view(item: dict) -> dict:
+    """A catalog entry in the shape `app.py` renders."""
+    return {
+        "slug": item["slug"],
+        "name_en": item["en"],
+        "name_te": item["te"],
+        "summary_en": item["desc_en"],
+        "summary_te": item["desc_te"],
+        "image_url": item["img"],
+    }
@@ -0,0 +1,185 @@
+# utils/dedup.py
+"""Near-duplicate detection for contributed records (MinHash + LSH).
+
+A record's title and description are reduced to the search index's phonetic keys
+(Telugu is romanised first), so "Bonalu jatara", "bonaalu jaatara" and "బోనాలు జాతర"
+all read alike. Overlapping character 4-grams of those keys become its shingles.
+MinHash compresses the shingle set into DEDUP_PERMUTATIONS small integers, and two
+records agree in any one position with probability equal to their Jaccard
+similarity. Signatures are cut into bands. Records that agree on a whole band share
+a bucket, so a lookup is one dict probe per band instead of a scan. Candidates are
+then checked against DEDUP_THRESHOLD using the full signature.
+"""
+from __future__ import annotations
+import os, threading, zlib
+
+import numpy as np
+
+from utils.search import _terms
+
+DEDUP_PERMUTATIONS = 128   # signature length
+DEDUP_BANDS = 32           # LSH bands (rows per band = permutations / bands)
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))   # estimated Jaccard; short templated texts reach ~0.6
+SHINGLE = 4                # characters per shingle
+TEXT_FIELDS = ("title", "description", "en", "te", "desc_en", "desc_te")
+
+_ROWS = DEDUP_PERMUTATIONS // DEDUP_BANDS
+_rng = np.random.default_rng(0x5EED)  # fixed, so signatures mean the same thing in every process
+_A = _rng.integers(1, 2**63, DEDUP_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)  # odd multipliers
+_B = _rng.integers(0, 2**63, DEDUP_PERMUTATIONS, dtype=np.uint64)
+
+
+def _text(doc: dict) -> str:
+    return " ".join(str(doc[f]) for f in TEXT_FIELDS if doc.get(f))
+
+
+def shingles(doc: dict) -> set[str]:
+    """Character 4-grams of the phonetic keys of a record's text fields."""
+    text = _text(doc)
+    keys = " ".join(key for key, _ in _terms(text))
+    if len(keys) <= SHINGLE:
+        return {keys} if keys else set()
+    return {keys[i:i + SHINGLE] for i in range(len(keys) - SHINGLE + 1)}
+
+
+def signature(doc: dict) -> np.ndarray | None:
+    """MinHash signature (uint32 × DEDUP_PERMUTATIONS), or None when the record has no text."""
+    grams = shingles(doc)
+    if not grams:
+        return None
+    x = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), np.uint64, len(grams))
+    # Multiply-shift hashing: one row per shingle, one column per permutation, min down columns.
+    with np.errstate(over="ignore"):
+        h = (x[:, None] * _A + _B) >> np.uint64(32)
+    return h.min(axis=0).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """Incremental LSH index keyed by caller-chosen ids (e.g. "record:42", "outbox:7")."""
+
+    def __init__(self):
+        self._sigs: dict[str, np.ndarray] = {}
+        self._labels: dict[str, str] = {}
+        self._texts: dict[str, int] = {}   # key -> hash of the text it was signed from
+        self._buckets: list[dict[bytes, set[str]]] = [{} for _ in range(DEDUP_BANDS)]
+        self._applied: set[str] = set()   # snapshot files already indexed
+        self._lock = threading.RLock()
+        self._updating = threading.Lock()  # one snapshot update at a time
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    @staticmethod
+    def _bands(sig: np.ndarray):
+        for b in range(DEDUP_BANDS):
+            yield b, sig[b * _ROWS:(b + 1) * _ROWS].tobytes()
+
+    def add(self, key: str, doc: dict, label: str | None = None) -> bool:
+        """Index (or re-index) `doc` under `key`; False when it has no text to compare."""
+        text = hash(_text(doc))
+        if self._texts.get(key) == text:
+            return True  # unchanged: skip the signature, the costly part
+        sig = signature(doc)
+        with self._lock:
+            self.remove(key)
+            if sig is None:
+                return False
+            self._sigs[key] = sig
+            self._texts[key] = text
+            self._labels[key] = str(label if label is not None else doc.get("title") or "")
+            for b, band in self._bands(sig):
+                self._buckets[b].setdefault(band, set()).add(key)
+            return True
+
+    def add_many(self, items) -> int:
+        """`items` is an iterable of (key, doc); returns how many were indexed."""
+        return sum(self.add(key, doc) for key, doc in items)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            sig = self._sigs.pop(key, None)
+            if sig is None:
+                return
+            self._labels.pop(key, None)
+            self._texts.pop(key, None)
+            for b, band in self._bands(sig):
+                bucket = self._buckets[b].get(band)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[b][band]
+
+    def similar(self, doc: dict, *, threshold: float = DEDUP_THRESHOLD, limit: int = 5,
+                exclude: str | None = None) -> list[tuple[str, str, float]]:
+        """Indexed records resembling `doc`, as (key, label, estimated Jaccard), most similar first."""
+        sig = signature(doc)
+        if sig is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for b, band in self._bands(sig):
+                candidates |= self._buckets[b].get(band, set())
+            candidates.discard(exclude)
+            hits = []
+            for key in candidates:
+                score = float(np.count_nonzero(self._sigs[key] == sig)) / DEDUP_PERMUTATIONS
+                if score >= threshold:
+                    hits.append((key, self._labels[key], score))
+        hits.sort(key=lambda h: h[2], reverse=True)
+        return hits[:limit]
+
+    @staticmethod
+    def _snapshot_files(snap) -> list[str]:
+        st = snap.state()
+        return ([st["base"]] if st["base"] else []) + st["deltas"]
+
+    def update(self, snap) -> bool:
+        """Index snapshot files not seen yet (as "record:<id>"); False if nothing changed.
+
+        After a compaction the new base is read in full, but records whose text is
+        unchanged are skipped before signing. Lookups keep working meanwhile.
+        """
+        import pyarrow.parquet as pq
+
+        with self._updating:
+            files = self._snapshot_files(snap)
+            todo = [f for f in files if f not in self._applied]
+            if not todo:
+                return False
+            for name in todo:
+                try:
+                    df = pq.read_table(os.path.join(snap.root, name), columns=["id", "title", "description"],
+                                       memory_map=True).to_pandas()
+                except FileNotFoundError:
+                    continue  # compacted away meanwhile; its rows are in the new base
+                df = df.drop_duplicates("id", keep="last")
+                self.add_many(zip("record:" + df["id"], df[["title", "description"]].fillna("").to_dict("records")))
+            self._applied = set(files)
+            return True
+
+    def refresh(self, snap) -> bool:
+        """`update(snap)` on a daemon thread when there is something new; returns at once."""
+        if set(self._snapshot_files(snap)) <= self._applied or self._updating.locked():
+            return False
+
+        def run():
+            try:
+                self.update(snap)
+            except Exception:
+                pass  # the next refresh tries again
+
+        threading.Thread(target=run, name="dedup-update", daemon=True).start()
+        return True
+
+
+_shared: DuplicateIndex | None = None
+_shared_lock = threading.Lock()
+
+
+def duplicate_index() -> DuplicateIndex:
+    """Process-wide duplicate index; callers `add()` records as they arrive."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DuplicateIndex()
+        return _shared
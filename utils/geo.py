@@ -0,0 +1,144 @@
+# utils/geo.py
+"""Spatial index over geotagged records, with per-zoom clustering for maps.
+
+Each point gets an integer geohash (26 longitude + 26 latitude bits, interleaved as
+in geohash). Points are kept sorted by that code, so every geohash cell is a
+contiguous run. Clustering at a zoom level is then one shift plus `np.add.reduceat`.
+Cluster tables are cached per (index version, zoom).
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+BITS = 26                 # per axis; ~0.6 m cells at full precision
+CLUSTER_CACHE_SIZE = 32   # (version, zoom) cluster tables kept
+
+
+def _spread(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit between each of the low 32 bits (Morton / geohash interleave)."""
+    v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def encode(lat, lon) -> np.ndarray:
+    """Integer geohashes (uint64, 2*BITS bits, longitude first) for arrays of coordinates."""
+    scale = float(1 << BITS)
+    y = np.clip(((np.asarray(lat, dtype=float) + 90.0) / 180.0 * scale), 0, scale - 1).astype(np.uint64)
+    x = np.clip(((np.asarray(lon, dtype=float) + 180.0) / 360.0 * scale), 0, scale - 1).astype(np.uint64)
+    return (_spread(x) << np.uint64(1)) | _spread(y)
+
+
+def zoom_bits(zoom: float) -> int:
+    """Bits per axis for clusters at a web-map zoom level: ~8 cells across a map tile."""
+    return int(min(BITS, max(1, round(zoom) + 3)))
+
+
+class GeoIndex:
+    """Incremental point index keyed by caller-chosen ids (e.g. "record:42")."""
+
+    def __init__(self):
+        self._points: dict[str, tuple[float, float, str]] = {}   # key -> (lat, lon, label)
+        self._version = 0
+        self._built = -1
+        self._codes = np.empty(0, np.uint64)
+        self._lat = self._lon = np.empty(0)
+        self._labels = np.empty(0, object)
+        self._clusters: OrderedDict[tuple[int, int], pd.DataFrame] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def add(self, key: str, lat, lon, label: str = "") -> bool:
+        """Insert or move a point; ignored (False) unless both coordinates are valid."""
+        try:
+            lat, lon = float(lat), float(lon)
+        except (TypeError, ValueError):
+            return False
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+            return False  # the form sends 0.0 for "not given"
+        with self._lock:
+            if self._points.get(key) != (lat, lon, label):
+                self._points[key] = (lat, lon, label)
+                self._version += 1
+        return True
+
+    def add_many(self, items) -> int:
+        """`items` of (key, lat, lon, label); returns how many were valid."""
+        return sum(self.add(*item) for item in items)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            if self._points.pop(key, None) is not None:
+                self._version += 1
+
+    def _build(self) -> None:
+        if self._built == self._version:
+            return
+        n = len(self._points)
+        vals = list(self._points.values())
+        lat = np.fromiter((v[0] for v in vals), float, n)
+        lon = np.fromiter((v[1] for v in vals), float, n)
+        labels = np.fromiter((v[2] for v in vals), object, n)
+        codes = encode(lat, lon)
+        order = np.argsort(codes, kind="stable")
+        self._codes, self._lat, self._lon = codes[order], lat[order], lon[order]
+        self._labels = labels[order]
+        self._built = self._version
+
+    def clusters(self, zoom: float, bbox: tuple[float, float, float, float] | None = None) -> pd.DataFrame:
+        """One row per occupied cell at `zoom`: lat/lon centroid, count, cell, and a label
+        when the cell holds a single point. `bbox` is (lat_min, lat_max, lon_min, lon_max)."""
+        bits = zoom_bits(zoom)
+        with self._lock:
+            self._build()
+            key = (self._version, bits)
+            df = self._clusters.get(key)
+            if df is None:
+                df = self._aggregate(bits)
+                self._clusters[key] = df
+                while len(self._clusters) > CLUSTER_CACHE_SIZE:
+                    self._clusters.popitem(last=False)
+            else:
+                self._clusters.move_to_end(key)
+        if bbox is not None:
+            lat_min, lat_max, lon_min, lon_max = bbox
+            df = df[df.lat.between(lat_min, lat_max) & df.lon.between(lon_min, lon_max)]
+        return df
+
+    def _aggregate(self, bits: int) -> pd.DataFrame:
+        if not len(self._codes):
+            return pd.DataFrame({"lat": [], "lon": [], "count": [], "cell": [], "label": []})
+        cells = self._codes >> np.uint64(2 * (BITS - bits))
+        starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+        counts = np.diff(np.r_[starts, len(cells)])
+        return pd.DataFrame({
+            "lat": np.add.reduceat(self._lat, starts) / counts,
+            "lon": np.add.reduceat(self._lon, starts) / counts,
+            "count": counts,
+            "cell": cells[starts],
+            "label": np.where(counts == 1, self._labels[starts], ""),
+        })
+
+
+_shared: GeoIndex | None = None
+_shared_lock = threading.Lock()
+
+
+def geo_index() -> GeoIndex:
+    """Process-wide index over geotagged records; callers `add()` records as they arrive."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = GeoIndex()
+        return _shared
@@ -0,0 +1,117 @@
+# utils/http_cache.py
+"""Shared on-disk cache for GET responses, honouring Cache-Control and validators.
+
+Entries live in one SQLite (WAL) file so every server process shares them. Fresh
+entries are served without a request; stale ones are revalidated with
+If-None-Match / If-Modified-Since, so unchanged data costs a 304. Total body size is
+bounded and the least recently used entries are evicted first.
+"""
+from __future__ import annotations
+import hashlib, os, sqlite3, threading, time
+
+from utils.api_client import CACHE_DIR
+
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", os.path.join(CACHE_DIR, "http_cache.sqlite3"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    body          BLOB NOT NULL,
+    size          INTEGER NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    expires       REAL NOT NULL,
+    last_access   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access);
+"""
+
+
+def cache_key(url: str, params, scope: str | None) -> str:
+    """Key for a GET: URL, sorted params and an auth scope (e.g. a token hash)."""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return hashlib.sha256(repr((url, items, scope or "")).encode()).hexdigest()
+
+
+def freshness(headers) -> float | None:
+    """Seconds the response may be reused without revalidation; None means don't store it."""
+    directives = {}
+    for part in (headers.get("Cache-Control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip().strip('"')
+    if "no-store" in directives:
+        return None  # `private` is fine: keys include the caller's auth scope
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0.0, float(directives[name]))
+            except ValueError:
+                return 0.0
+    return 0.0  # no explicit lifetime: keep it, but always revalidate
+
+
+class HTTPCache:
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.path, self.max_bytes = path, max_bytes
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT body, etag, last_modified, expires FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn().execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        body, etag, last_modified, expires = row
+        return {"body": bytes(body), "etag": etag, "last_modified": last_modified, "expires": expires}
+
+    def put(self, key: str, body: bytes, *, etag: str | None, last_modified: str | None, ttl: float) -> None:
+        if len(body) > self.max_bytes // 4:
+            return  # one huge payload shouldn't flush everything else
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO responses (key, body, size, etag, last_modified, expires, last_access)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, body, len(body), etag, last_modified, now + ttl, now),
+        )
+        self._evict()
+
+    def refresh(self, key: str, ttl: float) -> None:
+        """A 304 arrived: the stored body is still good for `ttl` more seconds."""
+        now = time.time()
+        self._conn().execute(
+            "UPDATE responses SET expires = ?, last_access = ? WHERE key = ?", (now + ttl, now, key)
+        )
+
+    def drop(self, key: str) -> None:
+        self._conn().execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _evict(self) -> None:
+        db = self._conn()
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * 0.9)  # free a little extra to avoid thrashing
+        freed = 0
+        victims = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", victims)
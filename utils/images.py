@@ -0,0 +1,153 @@
+# utils/images.py
+"""Responsive image derivatives for festival artwork.
+
+    python -m utils.images            # warm up everything under assets/festivals
+
+Each source image gets content-hash-named JPEG + WebP variants at a few widths and a
+tiny blurred placeholder. A JSON manifest maps sources to their variants. Pages hand
+the browser every width as a `srcset` (it picks by viewport and pixel density) and
+show the placeholder until the chosen file arrives; `pick_variant` serves callers
+that need a single file.
+"""
+from __future__ import annotations
+import base64, glob, hashlib, io, os, sys, threading
+
+from PIL import Image, ImageFilter, ImageOps
+
+from utils.api_client import CACHE_DIR, _read_json, _write_json
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FESTIVAL_DIR = os.path.join(APP_ROOT, "assets", "festivals")
+DERIVED_DIR = os.getenv("DERIVED_DIR", os.path.join(CACHE_DIR, "images"))
+MANIFEST = os.path.join(DERIVED_DIR, "manifest.json")
+
+WIDTHS = (240, 480, 960)
+JPEG_QUALITY, WEBP_QUALITY = 82, 78
+PLACEHOLDER_WIDTH = 24
+
+_lock = threading.Lock()
+
+
+def _flatten(im: Image.Image, background=(14, 15, 19)) -> Image.Image:
+    """Drop alpha onto the app's dark surface colour (JPEG has no transparency)."""
+    im = ImageOps.exif_transpose(im)
+    if im.mode in ("RGBA", "LA", "P"):
+        im = im.convert("RGBA")
+        base = Image.new("RGB", im.size, background)
+        base.paste(im, mask=im.getchannel("A"))
+        return base
+    return im.convert("RGB")
+
+
+def _resized(im: Image.Image, width: int) -> Image.Image:
+    if im.width <= width:
+        return im
+    return im.resize((width, round(im.height * width / im.width)), Image.Resampling.LANCZOS)
+
+
+def _placeholder(im: Image.Image) -> str:
+    tiny = _resized(im, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    buf = io.BytesIO()
+    tiny.save(buf, "JPEG", quality=40)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def _key(src: str) -> str:
+    return os.path.relpath(os.path.abspath(src), APP_ROOT).replace(os.sep, "/")
+
+
+def build_derivatives(src: str) -> dict:
+    """Generate variants for one image and return its manifest entry."""
+    with open(src, "rb") as fh:
+        raw = fh.read()
+    digest = hashlib.sha256(raw).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(src))[0]
+    im = _flatten(Image.open(io.BytesIO(raw)))
+    os.makedirs(DERIVED_DIR, exist_ok=True)
+
+    variants = {}
+    for w in sorted({min(w, im.width) for w in WIDTHS}):
+        scaled = _resized(im, w)
+        files = {}
+        for fmt, ext, opts in (
+            ("JPEG", "jpg", {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}),
+            ("WEBP", "webp", {"quality": WEBP_QUALITY, "method": 4}),
+        ):
+            name = f"{stem}-{digest}-{w}.{ext}"
+            path = os.path.join(DERIVED_DIR, name)
+            if not os.path.exists(path):  # content-addressed: same name means same bytes
+                tmp = path + ".tmp"
+                scaled.save(tmp, fmt, **opts)
+                os.replace(tmp, path)
+            files[ext] = name
+        variants[str(w)] = files
+
+    return {
+        "hash": digest,
+        "mtime": os.path.getmtime(src),
+        "size": [im.width, im.height],
+        "variants": variants,
+        "placeholder": _placeholder(im),
+    }
+
+
+def ensure_derivatives(sources) -> dict:
+    """Make sure every source has up-to-date variants; returns the full manifest."""
+    with _lock:
+        manifest = _read_json(MANIFEST)
+        changed = False
+        for src in sources:
+            key = _key(src)
+            entry = manifest.get(key)
+            if entry and entry.get("mtime") == os.path.getmtime(src) and all(
+                os.path.exists(os.path.join(DERIVED_DIR, f)) for v in entry["variants"].values() for f in v.values()
+            ):
+                continue
+            manifest[key] = build_derivatives(src)
+            changed = True
+        if changed:
+            _write_json(MANIFEST, manifest)
+        return manifest
+
+
+def pick_variant(manifest: dict, src: str, width: int, *, webp: bool = True) -> str:
+    """Path of the smallest variant at least `width` px wide (or the largest there is).
+
+    Falls back to the original file when the source has no manifest entry.
+    """
+    entry = manifest.get(_key(src))
+    if not entry:
+        return src
+    widths = sorted(int(w) for w in entry["variants"])
+    chosen = next((w for w in widths if w >= width), widths[-1])
+    files = entry["variants"][str(chosen)]
+    return os.path.join(DERIVED_DIR, files["webp" if webp else "jpg"])
+
+
+def srcset(manifest: dict, src: str, url, *, webp: bool = True) -> str | None:
+    """`srcset` value listing every variant as "<url(path)> <width>w", or None without an entry."""
+    entry = manifest.get(_key(src))
+    if not entry:
+        return None
+    ext = "webp" if webp else "jpg"
+    widths = sorted(int(w) for w in entry["variants"])
+    return ", ".join(f"{url(os.path.join(DERIVED_DIR, entry['variants'][str(w)][ext]))} {w}w" for w in widths)
+
+
+def placeholder(manifest: dict, src: str) -> str | None:
+    """Tiny blurred data: URI to paint while the real image loads."""
+    entry = manifest.get(_key(src))
+    return entry["placeholder"] if entry else None
+
+
+def festival_sources() -> list[str]:
+    return sorted(glob.glob(os.path.join(FESTIVAL_DIR, "*.jpg")) + glob.glob(os.path.join(FESTIVAL_DIR, "*.png")))
+
+
+if __name__ == "__main__":
+    srcs = sys.argv[1:] or festival_sources()
+    m = ensure_derivatives(srcs)
+    for s in srcs:
+        e = m[_key(s)]
+        total = sum(os.path.getsize(os.path.join(DERIVED_DIR, f)) for v in e["variants"].values() for f in v.values())
+        print(f"{_key(s)}: {len(e['variants'])} widths, {total // 1024} KB of variants")
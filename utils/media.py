@@ -0,0 +1,327 @@
+# utils/media.py
+"""Media attached to contributions: spool to disk, clean images, upload in resumable chunks.
+
+With MEDIA_UPLOAD_PORT set, the browser sends files straight to CACHE_DIR/media in
+MEDIA_CHUNK_SIZE pieces (`ChunkReceiver`, driven by the uploader in utils/ui.py), so a
+session never holds more than one chunk in memory. Without it the page falls back to
+st.file_uploader, which buffers the whole file in RAM first; .streamlit/config.toml
+caps that at server.maxUploadSize. Either way the file is then spooled block by block. Images are oriented, downscaled and re-encoded without EXIF (GPS,
+camera serials). Every spool gets its own file and upload uuid, so two sessions
+sending the same file never share (or delete) each other's upload. Files go to the
+API in MEDIA_CHUNK_SIZE pieces, sent by the outbox flusher rather than the page.
+Finished chunk numbers are checkpointed next to the file, so a retried send resumes
+instead of starting over.
+"""
+from __future__ import annotations
+import hashlib, hmac, math, os, random, re, secrets, tempfile, threading, time, uuid
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.api_client import CACHE_DIR, _read_json, _write_json
+
+MEDIA_DIR = os.path.join(CACHE_DIR, "media")
+MEDIA_CHUNK_SIZE = int(os.getenv("MEDIA_CHUNK_SIZE", str(5 * 1024 * 1024)))
+MEDIA_MAX_SIDE = int(os.getenv("MEDIA_MAX_SIDE", "2048"))       # px, longest image side
+MEDIA_RETRIES = int(os.getenv("MEDIA_RETRIES", "3"))            # per chunk
+MEDIA_MAX_AGE = float(os.getenv("MEDIA_MAX_AGE", "86400"))      # seconds an abandoned upload is kept
+MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(1024 ** 3)))   # largest file the receiver accepts
+MEDIA_UPLOAD_PORT = int(os.getenv("MEDIA_UPLOAD_PORT", "0"))     # chunk receiver; 0 = off (st.file_uploader)
+MEDIA_UPLOAD_URL = os.getenv("MEDIA_UPLOAD_URL", "").rstrip("/")  # how browsers reach it; default: page host + port
+
+TYPES = {
+    "image": (".jpg", ".jpeg", ".png", ".webp"),
+    "video": (".mp4", ".mov", ".webm", ".mkv"),
+    "audio": (".mp3", ".wav", ".m4a", ".ogg"),
+}
+ACCEPTED = [ext.lstrip(".") for exts in TYPES.values() for ext in exts]
+_BLOCK = 1024 * 1024
+
+
+class UploadError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Media:
+    path: str
+    filename: str
+    size: int
+    sha256: str
+    media_type: str
+    upload_uuid: str  # per spool, so concurrent uploads of one file stay apart
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @property
+    def total_chunks(self) -> int:
+        return max(1, math.ceil(self.size / MEDIA_CHUNK_SIZE))
+
+    def fields(self) -> dict:
+        """What `create_record` needs to link the uploaded file."""
+        return {"upload_uuid": self.upload_uuid, "filename": self.filename,
+                "total_chunks": self.total_chunks, "media_type": self.media_type}
+
+
+def media_type_for(filename: str) -> str | None:
+    ext = os.path.splitext(filename)[1].lower()
+    return next((kind for kind, exts in TYPES.items() if ext in exts), None)
+
+
+def prune(keep=()) -> int:
+    """Delete files in MEDIA_DIR older than MEDIA_MAX_AGE, except `keep` (media paths still
+    waiting to be sent) and their checkpoints. Returns how many were removed."""
+    cutoff = time.time() - MEDIA_MAX_AGE
+    kept = tuple(os.path.basename(p) for p in keep)
+    removed = 0
+    try:
+        names = os.listdir(MEDIA_DIR)
+    except OSError:
+        return 0
+    for name in names:
+        if kept and name.startswith(kept):
+            continue
+        path = os.path.join(MEDIA_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _copy(src, dst: str) -> str:
+    """Copy a file object to `dst` in blocks; returns the sha256 of what was written."""
+    h = hashlib.sha256()
+    with open(dst, "wb") as out:
+        while block := src.read(_BLOCK):
+            h.update(block)
+            out.write(block)
+    return h.hexdigest()
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while block := fh.read(_BLOCK):
+            h.update(block)
+    return h.hexdigest()
+
+
+def clean_image(src: str, dst: str, max_side: int = MEDIA_MAX_SIDE) -> None:
+    """Apply EXIF orientation, fit within `max_side` and save without EXIF or other metadata."""
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as im:
+        fmt = im.format if im.format in ("JPEG", "PNG", "WEBP") else "JPEG"
+        im.draft("RGB", (max_side, max_side))  # JPEG: decode at reduced scale, far less memory
+        out = ImageOps.exif_transpose(im)
+        out.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        icc = im.info.get("icc_profile")
+    if fmt == "JPEG" and out.mode not in ("RGB", "L"):
+        out = out.convert("RGB")
+    opts = {"JPEG": {"quality": 85, "optimize": True, "progressive": True},
+            "WEBP": {"quality": 85, "method": 4}, "PNG": {"optimize": True}}[fmt]
+    out.save(dst, fmt, icc_profile=icc, **opts)  # no exif= / pnginfo=: metadata is dropped
+
+
+def _finish(raw: str, filename: str, kind: str, digest: str) -> Media:
+    """Clean an image in place if need be and move `raw` to its final, per-upload name."""
+    name, ext = os.path.splitext(os.path.basename(filename))
+    try:
+        if kind == "image":
+            cleaned = raw + ext.lower()
+            try:
+                clean_image(raw, cleaned)
+            except Exception as e:
+                raise UploadError(f"Could not read image {filename}: {e}") from None
+            os.replace(cleaned, raw)
+            digest = _sha256(raw)
+        upload_uuid = str(uuid.uuid4())
+        path = os.path.join(MEDIA_DIR, upload_uuid + ext.lower())
+        os.replace(raw, path)
+    except BaseException:
+        if os.path.exists(raw):
+            os.remove(raw)
+        raise
+    return Media(path, f"{name}{ext.lower()}", os.path.getsize(path), digest, kind, upload_uuid)
+
+
+def spool(fileobj, filename: str) -> Media:
+    """Copy an uploaded file object to MEDIA_DIR (cleaning images) without reading it whole."""
+    kind = media_type_for(filename)
+    if kind is None:
+        raise UploadError(f"Unsupported file type: {filename}")
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    fd, raw = tempfile.mkstemp(dir=MEDIA_DIR, suffix=".part")
+    os.close(fd)
+    try:
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+        digest = _copy(fileobj, raw)
+    except BaseException:
+        os.remove(raw)
+        raise
+    return _finish(raw, filename, kind, digest)
+
+
+# --------------- browser uploads, chunk by chunk ---------------
+_SECRET = secrets.token_bytes(32)  # slots are only valid in the process that issued them
+_SLOT = re.compile(r"[0-9a-f]{32}")
+
+
+def _sign(slot: str) -> str:
+    return hmac.new(_SECRET, slot.encode(), hashlib.sha256).hexdigest()
+
+
+def _slot_path(slot: str) -> str:
+    return os.path.join(MEDIA_DIR, f"slot-{slot}.part")
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def upload_slot() -> tuple[str, str]:
+    """A fresh (slot, token) pair for one browser upload to `ChunkReceiver`."""
+    slot = uuid.uuid4().hex
+    return slot, _sign(slot)
+
+
+def receive(slot: str, filename: str) -> Media:
+    """Spool a browser upload that `ChunkReceiver` has finished (cleaning images)."""
+    kind = media_type_for(filename)
+    if kind is None:
+        raise UploadError(f"Unsupported file type: {filename}")
+    path = _slot_path(slot)
+    if not _SLOT.fullmatch(slot) or not os.path.exists(path):
+        raise UploadError(f"{filename} did not arrive; choose it again.")
+    return _finish(path, filename, kind, _sha256(path))
+
+
+class ChunkReceiver(BaseHTTPRequestHandler):
+    """`PUT /<slot>?token=…&offset=N` appends one chunk to that slot's file; `HEAD` reports its size.
+
+    Chunks must arrive in order: a PUT whose offset isn't the current size gets 409 and
+    the size in `Upload-Offset`, which is where the browser resumes.
+    """
+
+    server_version = "mana-media"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, code: int, offset: int | None = None) -> None:
+        self.send_response(code)
+        self.send_header("Access-Control-Allow-Origin", "*")  # the page is on another port
+        self.send_header("Access-Control-Allow-Methods", "PUT, HEAD, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Access-Control-Expose-Headers", "Upload-Offset")
+        if offset is not None:
+            self.send_header("Upload-Offset", str(offset))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _slot(self) -> tuple[str | None, dict]:
+        url = urlsplit(self.path)
+        slot, query = url.path.strip("/"), parse_qs(url.query)
+        token = query.get("token", [""])[0]
+        if not _SLOT.fullmatch(slot) or not hmac.compare_digest(token, _sign(slot)):
+            return None, query
+        return slot, query
+
+    def do_OPTIONS(self):
+        self._reply(204)
+
+    def do_HEAD(self):
+        slot, _ = self._slot()
+        self._reply(403) if slot is None else self._reply(200, _size(_slot_path(slot)))
+
+    def do_PUT(self):
+        slot, query = self._slot()
+        if slot is None:
+            return self._reply(403)
+        path = _slot_path(slot)
+        try:
+            offset = int(query.get("offset", ["0"])[0])
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            return self._reply(400)
+        if offset == 0 and "restart" in query and os.path.exists(path):
+            os.remove(path)  # another file chosen for the same slot
+        have = _size(path)
+        if offset != have:
+            return self._reply(409, have)
+        if length > MEDIA_CHUNK_SIZE or have + length > MEDIA_MAX_BYTES:
+            return self._reply(413, have)
+        os.makedirs(MEDIA_DIR, exist_ok=True)
+        left = length
+        with open(path, "ab") as out:
+            while left:
+                block = self.rfile.read(min(_BLOCK, left))
+                if not block:
+                    break  # connection dropped; the browser resumes from Upload-Offset
+                out.write(block)
+                left -= len(block)
+        self._reply(400 if left else 204, _size(path))
+
+
+_receiver: ThreadingHTTPServer | None = None
+_receiver_lock = threading.Lock()
+
+
+def start_receiver() -> bool:
+    """Serve `ChunkReceiver` on MEDIA_UPLOAD_PORT, once per process; False when that is off."""
+    global _receiver
+    if not MEDIA_UPLOAD_PORT:
+        return False
+    with _receiver_lock:
+        if _receiver is None:
+            _receiver = ThreadingHTTPServer(("0.0.0.0", MEDIA_UPLOAD_PORT), ChunkReceiver)
+            threading.Thread(target=_receiver.serve_forever, name="media-receiver", daemon=True).start()
+    return True
+
+
+def upload(client, media: Media, *, progress=None, retries: int = MEDIA_RETRIES) -> dict:
+    """Send `media` chunk by chunk, skipping chunks a previous attempt delivered.
+
+    `progress(fraction)` is called after each chunk. Returns `media.fields()`; raises
+    UploadError when a chunk still fails after `retries` retries (progress is kept).
+    """
+    ckpt_path = media.path + ".upload.json"
+    ckpt = _read_json(ckpt_path)
+    if ckpt.get("uuid") != media.upload_uuid or ckpt.get("chunk_size") != MEDIA_CHUNK_SIZE:
+        ckpt = {"uuid": media.upload_uuid, "chunk_size": MEDIA_CHUNK_SIZE, "done": []}
+    done, total = set(ckpt["done"]), media.total_chunks
+
+    with open(media.path, "rb") as fh:
+        for i in range(total):
+            if i in done:
+                continue
+            fh.seek(i * MEDIA_CHUNK_SIZE)
+            data = fh.read(MEDIA_CHUNK_SIZE)
+            for attempt in range(retries + 1):
+                if client.upload_chunk(upload_uuid=media.upload_uuid, filename=media.filename,
+                                       chunk_index=i, total_chunks=total, data=data):
+                    break
+                if attempt < retries:
+                    time.sleep(random.uniform(0, min(5.0, 0.5 * 2 ** attempt)))
+            else:
+                raise UploadError(f"Upload of {media.filename} stopped at chunk {i + 1}/{total}.")
+            done.add(i)
+            ckpt["done"] = sorted(done)
+            _write_json(ckpt_path, ckpt)
+            if progress:
+                progress(len(done) / total)
+
+    for path in (media.path, ckpt_path):  # delivered; nothing left to resume
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return media.fields()
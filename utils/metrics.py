@@ -0,0 +1,150 @@
+# utils/metrics.py
+"""Per-endpoint request metrics for the API clients.
+
+Counts, status-code distribution and fixed-bucket latency histograms per
+(method, path). Memory is bounded (fixed buckets, capped number of series) and an
+observation is a lock plus a bisect. Percentiles are interpolated from the buckets,
+the same way Prometheus' histogram_quantile does. Export with `to_prometheus()`.
+"""
+from __future__ import annotations
+import threading
+from bisect import bisect_left
+
+# Upper bounds in seconds; the client timeout is 20s, so the last real bucket covers it.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, float("inf"))
+MAX_SERIES = 256
+_OVERFLOW = ("*", "(other)")
+
+
+class _Series:
+    __slots__ = ("counts", "total", "sum", "max", "statuses", "cache_hits", "coalesced")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.statuses: dict[str, int] = {}
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    def quantile(self, q: float) -> float | None:
+        if not self.total:
+            return None
+        rank, seen, lower = q * self.total, 0, 0.0
+        for upper, n in zip(BUCKETS, self.counts):
+            if n and seen + n >= rank:
+                if upper == float("inf"):
+                    return self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+            lower = upper
+        return self.max
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, method: str, path: str) -> _Series:
+        key = (method.upper(), path.strip("/"))
+        s = self._series.get(key)
+        if s is None:
+            if len(self._series) >= MAX_SERIES:
+                key = _OVERFLOW
+            s = self._series.setdefault(key, _Series())
+        return s
+
+    def observe(self, method: str, path: str, status: int, seconds: float) -> None:
+        """Record one upstream request. `status` 0 means no response (connection error/timeout)."""
+        code = str(status)
+        with self._lock:
+            s = self._get(method, path)
+            s.counts[bisect_left(BUCKETS, seconds)] += 1
+            s.total += 1
+            s.sum += seconds
+            s.max = max(s.max, seconds)
+            s.statuses[code] = s.statuses.get(code, 0) + 1
+
+    def cache_hit(self, method: str, path: str) -> None:
+        """A response served from cache without an upstream request."""
+        with self._lock:
+            self._get(method, path).cache_hits += 1
+
+    def coalesced(self, method: str, path: str) -> None:
+        """A caller that shared an identical in-flight request instead of sending its own."""
+        with self._lock:
+            self._get(method, path).coalesced += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> list[dict]:
+        """One row per endpoint, busiest first."""
+        with self._lock:
+            rows = []
+            for (method, path), s in self._series.items():
+                errors = sum(n for code, n in s.statuses.items() if code == "0" or code >= "500")
+                rows.append({
+                    "method": method,
+                    "path": path,
+                    "requests": s.total,
+                    "errors": errors,
+                    "error_rate": errors / s.total if s.total else 0.0,
+                    "cache_hits": s.cache_hits,
+                    "coalesced": s.coalesced,
+                    "statuses": dict(sorted(s.statuses.items())),
+                    "mean_ms": 1000 * s.sum / s.total if s.total else None,
+                    **{f"p{int(q * 100)}_ms": (None if (v := s.quantile(q)) is None else 1000 * v)
+                       for q in (0.5, 0.95, 0.99)},
+                })
+        return sorted(rows, key=lambda r: -(r["requests"] + r["cache_hits"] + r["coalesced"]))
+
+    def to_prometheus(self, prefix: str = "swecha_api") -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        def esc(v: str) -> str:
+            return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        lines = [
+            f"# HELP {prefix}_requests_total Upstream API requests by status code.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        with self._lock:
+            items = [(k, s.counts[:], s.total, s.sum, dict(s.statuses), s.cache_hits)
+                     for k, s in self._series.items()]
+            coalesced = [(k, s.coalesced) for k, s in self._series.items()]
+        for (method, path), _, _, _, statuses, _ in items:
+            for code, n in sorted(statuses.items()):
+                lines.append(f'{prefix}_requests_total{{method="{method}",path="{esc(path)}",code="{code}"}} {n}')
+        lines += [
+            f"# HELP {prefix}_cache_hits_total Responses served from cache without an upstream request.",
+            f"# TYPE {prefix}_cache_hits_total counter",
+        ]
+        for (method, path), _, _, _, _, hits in items:
+            lines.append(f'{prefix}_cache_hits_total{{method="{method}",path="{esc(path)}"}} {hits}')
+        lines += [
+            f"# HELP {prefix}_coalesced_total Callers that shared an identical in-flight request.",
+            f"# TYPE {prefix}_coalesced_total counter",
+        ]
+        for (method, path), n in coalesced:
+            lines.append(f'{prefix}_coalesced_total{{method="{method}",path="{esc(path)}"}} {n}')
+        lines += [
+            f"# HELP {prefix}_request_duration_seconds Upstream API request latency.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for (method, path), counts, total, total_s, _, _ in items:
+            labels = f'method="{method}",path="{esc(path)}"'
+            cumulative = 0
+            for upper, n in zip(BUCKETS, counts):
+                cumulative += n
+                le = "+Inf" if upper == float("inf") else repr(upper)
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {total_s:.6f}")
+            lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {total}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide instance shared by every client.
+METRICS = RequestMetrics()
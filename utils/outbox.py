@@ -0,0 +1,261 @@
+# utils/outbox.py
+"""Durable local outbox for contributions.
+
+Submitting commits the record to a SQLite (WAL) table and returns immediately; a
+background flusher drains pending rows to the corpus API in batches, retrying with
+backoff. Each row carries its own idempotency key (a uuid, not a hash of the content,
+so two users submitting the same text stay two records), and a resend after a crash
+can't duplicate it. A row may also carry a spooled media file: the flusher uploads it
+in chunks first, stores the returned fields in the payload, then creates the record,
+so the page never waits on the upload.
+"""
+from __future__ import annotations
+import json, os, random, sqlite3, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.api_client import CACHE_DIR, SwechaAPIClient
+from utils.media import Media, prune, upload
+
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join(CACHE_DIR, "outbox.sqlite3"))
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "16"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_PRUNE_EVERY = 3600.0  # seconds between sweeps of abandoned media files
+OUTBOX_LEASE = 120.0  # seconds a claimed row stays reserved (renewed per media chunk) before another flusher may retry it
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    key          TEXT NOT NULL,
+    owner        TEXT NOT NULL,
+    payload      TEXT NOT NULL,
+    token        TEXT,
+    media        TEXT,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    remote_id    TEXT,
+    error        TEXT,
+    created      REAL NOT NULL,
+    updated      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+CREATE INDEX IF NOT EXISTS outbox_owner ON outbox (owner, id);
+"""
+
+
+class LeaseLost(RuntimeError):
+    """Another flusher reclaimed a row this one was still sending."""
+
+
+class Outbox:
+    def __init__(self, path: str = OUTBOX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as db:
+            db.executescript(_SCHEMA)
+            if "media" not in {r["name"] for r in db.execute("PRAGMA table_info(outbox)")}:
+                db.execute("ALTER TABLE outbox ADD COLUMN media TEXT")  # outboxes from before media rows
+
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        return db
+
+    # --------------- producer side ---------------
+    def enqueue(self, payload: dict, *, owner: str, token: str | None = None, media: Media | None = None) -> int:
+        """Persist a record and any spooled media for sending; returns the row id. Never touches the network."""
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT INTO outbox (key, owner, payload, token, media, status, next_attempt, created, updated)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (uuid.uuid4().hex, owner, json.dumps(payload, ensure_ascii=False), token,
+             None if media is None else json.dumps(media.to_json()), PENDING, now, now, now),
+        )
+        return cur.lastrowid
+
+    def recent(self, owner: str, limit: int = 20) -> list[dict]:
+        rows = self._conn().execute(
+            "SELECT id, payload, status, attempts, remote_id, error, created, updated"
+            " FROM outbox WHERE owner = ? ORDER BY id DESC LIMIT ?",
+            (owner, limit),
+        ).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["title"] = json.loads(d.pop("payload")).get("title", "")
+            out.append(d)
+        return out
+
+    def prune_media(self) -> int:
+        """Delete old spooled media, keeping every file an unsent row still needs."""
+        rows = self._conn().execute(
+            "SELECT media FROM outbox WHERE media IS NOT NULL AND status != ?", (SENT,)
+        ).fetchall()
+        return prune({json.loads(m)["path"] for m, in rows})
+
+    def counts(self) -> dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    # --------------- flusher side ---------------
+    def claim(self, limit: int = OUTBOX_BATCH) -> list[dict]:
+        """Lease up to `limit` due rows. Expired leases (crashed flushers) are reclaimed.
+
+        Each row's "lease" is its expiry. Updates to the row must pass it back; they do
+        nothing once another flusher has reclaimed the row.
+        """
+        now = time.time()
+        lease = now + OUTBOX_LEASE
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                "SELECT id, key, payload, token, media, attempts FROM outbox"
+                " WHERE status IN (?, ?) AND next_attempt <= ? ORDER BY next_attempt LIMIT ?",
+                (PENDING, SENDING, now, limit),
+            ).fetchall()
+            if rows:
+                db.executemany(
+                    "UPDATE outbox SET status = ?, next_attempt = ?, updated = ? WHERE id = ?",
+                    [(SENDING, lease, now, r["id"]) for r in rows],
+                )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return [{**dict(r), "lease": lease} for r in rows]
+
+    def _leased(self, sql: str, params: tuple, row_id: int, lease: float) -> bool:
+        """Run an UPDATE on a row this flusher still holds; False if the lease was lost."""
+        cur = self._conn().execute(sql + " WHERE id = ? AND status = ? AND next_attempt = ?",
+                                   (*params, row_id, SENDING, lease))
+        return cur.rowcount == 1
+
+    def extend_lease(self, row_id: int, lease: float) -> float | None:
+        """Push a held lease OUTBOX_LEASE into the future; the new expiry, or None if it was lost."""
+        now = time.time()
+        renewed = now + OUTBOX_LEASE
+        ok = self._leased("UPDATE outbox SET next_attempt = ?, updated = ?", (renewed, now), row_id, lease)
+        return renewed if ok else None
+
+    def attach_media(self, row_id: int, lease: float, payload: dict) -> bool:
+        """The row's media is uploaded: keep its fields in the payload so a retry only resends the record."""
+        return self._leased("UPDATE outbox SET payload = ?, media = NULL, updated = ?",
+                            (json.dumps(payload, ensure_ascii=False), time.time()), row_id, lease)
+
+    def mark_sent(self, row_id: int, lease: float, remote_id, note: str | None = None) -> bool:
+        return self._leased("UPDATE outbox SET status = ?, remote_id = ?, token = NULL, error = ?, updated = ?",
+                            (SENT, None if remote_id is None else str(remote_id), note, time.time()), row_id, lease)
+
+    def mark_retry(self, row_id: int, lease: float, attempts: int, error: str) -> bool:
+        now = time.time()
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            return self._leased("UPDATE outbox SET status = ?, attempts = ?, token = NULL, error = ?, updated = ?",
+                                (FAILED, attempts, error, now), row_id, lease)
+        delay = random.uniform(0, min(300.0, 2.0 * 2 ** attempts))  # full-jitter backoff
+        return self._leased("UPDATE outbox SET status = ?, attempts = ?, next_attempt = ?, error = ?, updated = ?",
+                            (PENDING, attempts, now + delay, error, now), row_id, lease)
+
+    def retry_failed(self, owner: str, token: str | None) -> int:
+        """Put an owner's failed rows back in the queue, sent as `token` (the caller's current login).
+
+        Failed rows no longer hold a token. A row sent without one would go out under the
+        server's own API_TOKEN, so there is no retry without a token.
+        """
+        if not token:
+            raise PermissionError("Log in again to retry failed submissions.")
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE outbox SET status = ?, attempts = 0, next_attempt = ?, token = ?, updated = ?"
+            " WHERE owner = ? AND status = ?",
+            (PENDING, now, token, now, owner, FAILED),
+        )
+        return cur.rowcount
+
+
+class OutboxFlusher:
+    """Background thread that drains an Outbox to the API. `wake()` after enqueueing."""
+
+    def __init__(self, outbox: Outbox, *, api_base: str | None = None, workers: int = 4, poll: float = 5.0):
+        self.outbox, self.api_base, self.poll = outbox, api_base, poll
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outbox-send")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="outbox-flusher", daemon=True)
+
+    def start(self) -> "OutboxFlusher":
+        self._thread.start()
+        return self
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False)
+
+    def flush_once(self) -> int:
+        """Send one batch; returns how many rows were claimed."""
+        rows = self.outbox.claim()
+        if rows:
+            list(self._pool.map(self._send, rows))
+        return len(rows)
+
+    def _send(self, row) -> None:
+        client = SwechaAPIClient(self.api_base)
+        if row["token"]:
+            client.set_auth_token(row["token"])
+        payload, note, lease = json.loads(row["payload"]), None, row["lease"]
+
+        def renew(_fraction) -> None:
+            # A long upload outlives OUTBOX_LEASE; renew after every chunk so no other
+            # flusher reclaims the row meanwhile, and stop if one already has.
+            nonlocal lease
+            lease = self.outbox.extend_lease(row["id"], lease)
+            if lease is None:
+                raise LeaseLost(row["id"])
+
+        try:
+            if row["media"]:
+                media = Media(**json.loads(row["media"]))
+                if os.path.exists(media.path):
+                    payload.update(upload(client, media, progress=renew))
+                else:  # the spooled file is gone (cache cleared); don't lose the record with it
+                    note = f"Sent without {media.filename}: the file was no longer on this server."
+                if not self.outbox.attach_media(row["id"], lease, payload):
+                    raise LeaseLost(row["id"])
+            rec = client.create_record(idempotency_key=row["key"], **payload)
+        except LeaseLost:
+            return  # another flusher owns the row now; it decides what happens to it
+        except Exception as e:
+            rec, err = None, str(e)
+        else:
+            err = "API did not accept the record."
+        if rec:
+            self.outbox.mark_sent(row["id"], lease, rec.get("id") if isinstance(rec, dict) else None, note)
+        else:
+            self.outbox.mark_retry(row["id"], lease, row["attempts"] + 1, err)
+
+    def _run(self) -> None:
+        pruned = 0.0
+        while not self._stop.is_set():
+            try:
+                while self.flush_once() and not self._stop.is_set():
+                    pass
+                if time.time() - pruned > OUTBOX_PRUNE_EVERY:
+                    pruned = time.time()
+                    self.outbox.prune_media()
+            except Exception:
+                pass  # keep the thread alive; rows stay leased and are retried later
+            self._wake.wait(self.poll)
+            self._wake.clear()
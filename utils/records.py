@@ -0,0 +1,66 @@
+# utils/records.py
+from __future__ import annotations
+
+# Same choices the Contribute form offers.
+RELEASE_RIGHTS = ["CC BY-SA 4.0", "CC BY 4.0", "Public Domain (CC0)", "All rights reserved"]
+DEFAULT_LANGUAGE = "telugu"
+DEFAULT_CATEGORY_ID = 1
+
+
+def _opt_float(value, name: str, lo: float, hi: float, problems: list[str]) -> float | None:
+    if value in (None, ""):
+        return None
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        problems.append(f"{name} must be a number.")
+        return None
+    if not lo <= f <= hi:
+        problems.append(f"{name} must be between {lo:g} and {hi:g}.")
+        return None
+    return f or None  # the form treats 0.0 as "not given"
+
+
+def build_record(
+    *,
+    title=None,
+    description=None,
+    category_id=None,
+    language=None,
+    release_rights=None,
+    latitude=None,
+    longitude=None,
+    **_ignored,
+) -> tuple[dict, list[str]]:
+    """Normalise contribution fields into a `create_record` payload.
+
+    Returns `(payload, problems)`; the payload is only meaningful when `problems` is empty.
+    """
+    problems: list[str] = []
+    title = str(title or "").strip()
+    description = str(description or "").strip()
+    if not title:
+        problems.append("Title is required.")
+    if not description:
+        problems.append("Description is required.")
+
+    try:
+        cat = int(category_id) if category_id not in (None, "") else DEFAULT_CATEGORY_ID
+    except (TypeError, ValueError):
+        problems.append("category_id must be an integer.")
+        cat = DEFAULT_CATEGORY_ID
+
+    rights = str(release_rights or RELEASE_RIGHTS[0]).strip()
+    if rights not in RELEASE_RIGHTS:
+        problems.append(f"release_rights must be one of: {', '.join(RELEASE_RIGHTS)}.")
+
+    payload = {
+        "title": title,
+        "description": description,
+        "category_id": cat,
+        "language": str(language or "").strip() or DEFAULT_LANGUAGE,
+        "release_rights": rights,
+        "latitude": _opt_float(latitude, "latitude", -90, 90, problems),
+        "longitude": _opt_float(longitude, "longitude", -180, 180, problems),
+    }
+    return payload, problems
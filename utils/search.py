@@ -0,0 +1,349 @@
+# utils/search.py
+"""Local bilingual (English / తెలుగు) search over festivals and corpus records.
+
+Every word is reduced to a loose Latin "phonetic key" (Telugu is romanised first), so
+"bathukamma", "batukamma" and "బతుకమ్మ" share one vocabulary term; the key's character
+trigrams give prefix and typo tolerance. Telugu words are also indexed by native
+character bi/trigrams so partial Telugu queries work. Postings are compact arrays;
+updates and removals are incremental (removed docs are tombstoned, compacted in bulk).
+"""
+from __future__ import annotations
+import heapq, os, re, threading, unicodedata
+from array import array
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Field -> weight. Names count double; anything else in a doc is ignored.
+FIELDS = {
+    "en": 2, "te": 2, "title": 2, "name_en": 2, "name_te": 2,
+    "desc_en": 1, "desc_te": 1, "description": 1, "summary_en": 1, "summary_te": 1,
+}
+MIN_SCORE = 0.4    # fraction of the query's weight a hit must reach
+FUZZY_MIN = 0.55   # gram overlap for a typo-tolerant word match
+MAX_TERMS = 16     # vocabulary terms a single query word may expand to
+FUZZY_SCAN = 5000  # vocabulary postings longer than this are skipped when matching typos
+
+_TOKEN = re.compile(r"[\u0C00-\u0C7F]+|[a-z0-9]+")
+
+# ---- Telugu -> Latin (simplified; vowel length dropped, aspirates kept for the key rules)
+_CONS = dict(zip(
+    "కఖగఘఙచఛజఝఞటఠడఢణతథదధనపఫబభమయరఱలళఴవశషసహ",
+    "k kh g gh n ch chh j jh n t th d dh n t th d dh n p ph b bh m y r r l l l v sh sh s h".split(),
+))
+_VOWELS = dict(zip("అఆఇఈఉఊఋఎఏఐఒఓఔ", "a a i i u u ru e e ai o o au".split()))
+_SIGNS = dict(zip("ాిీుూృెేైొోౌ", "a i i u u ru e e ai o o au".split()))
+_MODS = {"ం": "m", "ః": "h", "ఁ": "n"}
+_VIRAMA = "్"
+
+
+def romanize(word: str) -> str:
+    out, inherent = [], False
+    for ch in word:
+        if ch in _CONS:
+            if inherent:
+                out.append("a")
+            out.append(_CONS[ch])
+            inherent = True
+        elif ch in _SIGNS:
+            out.append(_SIGNS[ch])
+            inherent = False
+        elif ch == _VIRAMA:
+            inherent = False
+        elif ch in _VOWELS or ch in _MODS:
+            if inherent:
+                out.append("a")
+            out.append(_VOWELS.get(ch) or _MODS[ch])
+            inherent = False
+    if inherent:
+        out.append("a")
+    return "".join(out)
+
+
+_ASPIRATE = re.compile(r"([kgcjtdpbs])h")
+_REPEAT = re.compile(r"(.)\1+")
+
+
+def phonetic_key(latin: str) -> str:
+    s = latin.replace("ee", "i").replace("oo", "u")
+    s = _ASPIRATE.sub(r"\1", s)
+    s = s.replace("w", "v").replace("z", "j").replace("q", "k").replace("x", "ks")
+    return _REPEAT.sub(r"\1", s)
+
+
+def _tokens(text: str):
+    text = unicodedata.normalize("NFC", str(text)).lower().replace("\u200c", "").replace("\u200d", "")
+    return _TOKEN.findall(text)
+
+
+def _terms(text: str):
+    """Yield `(phonetic key, native Telugu word or None)` per word of `text`."""
+    for tok in _tokens(text):
+        if "\u0C00" <= tok[0] <= "\u0C7F":  # Telugu block
+            key = phonetic_key(romanize(tok))
+            if key:
+                yield key, tok
+        else:
+            yield phonetic_key(tok), None
+
+
+def _key_grams(key: str, *, prefix: bool = False) -> set[str]:
+    """Trigrams of ^key$. Query words drop the end marker so they also match as prefixes."""
+    k = "^" + key + ("" if prefix else "$")
+    return {k[:2]} | {k[i:i + 3] for i in range(len(k) - 2)}
+
+
+def _native_grams(word: str) -> set[str]:
+    grams = {"t" + word[i:i + n] for n in (2, 3) for i in range(len(word) - n + 1)}
+    return grams or {"t" + word}
+
+
+class SearchIndex:
+    """Incremental two-level inverted index: grams -> vocabulary terms -> documents.
+
+    Fuzzy, prefix and transliterated matching happen on the (small) vocabulary; document
+    postings are then combined with set operations. Keys are caller-chosen
+    (e.g. "festival:bonalu", "record:42").
+    """
+
+    def __init__(self):
+        self._term_ids: dict[str, int] = {}                # phonetic key -> term id
+        self._term_keys: list[str] = []
+        self._gram_terms: dict[str, set[int]] = defaultdict(set)
+        self._seen_native: set[str] = set()
+        self._names: list[array] = []                      # term id -> doc ids (name fields)
+        self._descs: list[array] = []                      # term id -> doc ids (other fields)
+        self._docs: list[dict | None] = []                 # doc id -> doc (None once removed)
+        self._keys: list[str | None] = []
+        self._ids: dict[str, int] = {}                     # key -> live doc id
+        self._dead = 0
+        self._applied: set[str] = set()                    # snapshot files already indexed
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _term(self, key: str, native: str | None) -> int:
+        tid = self._term_ids.get(key)
+        if tid is None:
+            tid = self._term_ids[key] = len(self._term_keys)
+            self._term_keys.append(key)
+            self._names.append(array("I"))
+            self._descs.append(array("I"))
+            for g in _key_grams(key):
+                self._gram_terms[g].add(tid)
+        if native and native not in self._seen_native:
+            self._seen_native.add(native)
+            for g in _native_grams(native):
+                self._gram_terms[g].add(tid)
+        return tid
+
+    def add(self, key: str, doc: dict) -> None:
+        """Insert or replace a document."""
+        with self._lock:
+            self.remove(key)
+            doc_id = len(self._docs)
+            self._docs.append(doc)
+            self._keys.append(key)
+            self._ids[key] = doc_id
+            names, descs = set(), set()
+            for field, w in FIELDS.items():
+                value = doc.get(field)
+                if value:
+                    for term_key, native in _terms(value):
+                        (names if w > 1 else descs).add(self._term(term_key, native))
+            for tid in names:
+                self._names[tid].append(doc_id)
+            for tid in descs - names:
+                self._descs[tid].append(doc_id)
+
+    def add_many(self, items) -> None:
+        for key, doc in items:
+            self.add(key, doc)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            doc_id = self._ids.pop(key, None)
+            if doc_id is None:
+                return
+            self._docs[doc_id] = None
+            self._keys[doc_id] = None
+            self._dead += 1
+            if self._dead > 1000 and self._dead > len(self._docs) // 4:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild postings without tombstoned docs (doc ids are renumbered)."""
+        live = [(k, d) for k, d in zip(self._keys, self._docs) if d is not None]
+        applied = self._applied
+        self.__init__()
+        self._applied = applied
+        for key, doc in live:
+            self.add(key, doc)
+
+    def update(self, snap, columns=("id", "title", "description", "language", "release_rights")) -> bool:
+        """Index snapshot files not seen yet (as "record:<id>"); False if nothing changed.
+
+        After a compaction the new base is read in full, but records that are
+        unchanged keep their entries.
+        """
+        import pyarrow.parquet as pq
+
+        st = snap.state()
+        files = ([st["base"]] if st["base"] else []) + st["deltas"]
+        with self._lock:
+            todo = [f for f in files if f not in self._applied]
+            if not todo:
+                return False
+            for name in todo:
+                try:
+                    df = pq.read_table(os.path.join(snap.root, name), columns=list(columns),
+                                       memory_map=True).to_pandas()
+                except FileNotFoundError:
+                    continue  # compacted away meanwhile; its rows are in the new base
+                df = df.drop_duplicates("id", keep="last")
+                for doc in df.astype(object).where(df.notna(), None).to_dict("records"):
+                    key = f"record:{doc['id']}"
+                    old = self._ids.get(key)
+                    if old is None or self._docs[old] != doc:
+                        self.add(key, doc)
+            self._applied = set(files)
+            return True
+
+    def _match_terms(self, key: str, native: str | None) -> tuple[list[int], float]:
+        """Vocabulary terms for one query word, and how closely they match (0..1).
+
+        Exact and prefix matches win outright; typo-tolerant matches are only used
+        when the word matches nothing exactly.
+        """
+        gram_sets = [g for g in (_key_grams(key, prefix=True) if key else None,
+                                 _native_grams(native) if native else None) if g]
+        empty: set[int] = set()
+
+        def popular(tids) -> list[int]:
+            return heapq.nlargest(MAX_TERMS, tids, key=lambda t: len(self._names[t]) + len(self._descs[t]))
+
+        # Exact / prefix: terms carrying every gram of the word.
+        exact: set[int] = set()
+        for grams in gram_sets:
+            postings = sorted((self._gram_terms.get(g, empty) for g in grams), key=len)
+            exact |= postings[0].intersection(*postings[1:])
+        if exact:
+            return popular(exact), 1.0
+
+        # Typo-tolerant: count shared grams, skipping grams too common to discriminate.
+        sims: dict[int, float] = {}
+        for grams in gram_sets:
+            counts: Counter = Counter()
+            for g in grams:
+                tids = self._gram_terms.get(g, empty)
+                if len(tids) <= FUZZY_SCAN:
+                    counts.update(tids)
+            for tid, c in counts.items():
+                sims[tid] = max(sims.get(tid, 0.0), c / len(grams))
+        good = [t for t, s in sims.items() if s >= FUZZY_MIN]
+        if not good:
+            return [], 0.0
+        best = max(sims[t] for t in good)
+        return popular(t for t in good if sims[t] == best), best
+
+    def _newest(self, terms: list[int], sim: float, limit: int) -> list[tuple[str, dict, float]]:
+        """One query word: newest name matches, then newest description matches.
+
+        Postings are in doc-id (= insertion) order, so this walks their tails and
+        touches about `limit` docs however common the word is.
+        """
+        out, seen = [], set()
+        for postings, score in ((self._names, sim), (self._descs, sim / 2)):
+            if score < MIN_SCORE:
+                break
+            for d in heapq.merge(*(reversed(postings[t]) for t in terms), reverse=True):
+                if d in seen or self._docs[d] is None:
+                    continue
+                seen.add(d)
+                out.append((self._keys[d], self._docs[d], score))
+                if len(out) == limit:
+                    return out
+        return out
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[str, dict, float]]:
+        """Best matches as `(key, doc, score)`, score in (0, 1]; ties go to the newest doc."""
+        words = list(dict.fromkeys(_terms(query)))
+        if not words:
+            return []
+        with self._lock:
+            matches = [self._match_terms(key, native) for key, native in words]
+            if len(words) == 1 and limit:
+                return self._newest(*matches[0], limit)
+
+            # Per word: (name-field docs, other docs, similarity) as arrays. Copies, so the
+            # index's own postings stay resizable.
+            per = [(_concat(self._names, terms), _concat(self._descs, terms), sim) for terms, sim in matches]
+            sizes = [len(n) + len(d) for n, d, _ in per]
+            if not any(sizes):
+                return []
+            # Candidates: docs of the rarest word, kept if they carry every other word.
+            rare = min((i for i, size in enumerate(sizes) if size), key=sizes.__getitem__)
+            cand = np.unique(np.concatenate(per[rare][:2]))
+
+            def membership(cand):
+                named = [np.isin(cand, n, kind="table") if len(n) else np.zeros(len(cand), bool) for n, _, _ in per]
+                hit = [m | np.isin(cand, d, kind="table") if len(d) else m for m, (_, d, _) in zip(named, per)]
+                return named, hit
+
+            named, hit = membership(cand)
+            every = np.logical_and.reduce([h for h, size in zip(hit, sizes) if size])
+            if not every.all():
+                if every.any():
+                    cand, named, hit = cand[every], [m[every] for m in named], [h[every] for h in hit]
+                else:  # nothing has every word: keep docs with the most words
+                    cand = np.unique(np.concatenate([a for n, d, _ in per for a in (n, d)]))
+                    named, hit = membership(cand)
+                    counts = np.sum(hit, axis=0)
+                    most = counts == counts.max()
+                    cand, named, hit = cand[most], [m[most] for m in named], [h[most] for h in hit]
+
+            score = np.zeros(len(cand))
+            for m, h, (_, _, sim) in zip(named, hit, per):
+                score += sim * (h.astype(float) + m)  # 2 for a name-field match, 1 for any other
+            score /= 2 * len(words)
+
+            keep = score >= MIN_SCORE
+            cand, score = cand[keep], score[keep]
+            out = []
+            for level in np.unique(score)[::-1]:  # few distinct scores; newest first within each
+                for d in cand[score == level][::-1].tolist():
+                    if self._docs[d] is not None:
+                        out.append((self._keys[d], self._docs[d], float(level)))
+                        if len(out) == limit:
+                            return out
+            return out
+
+
+def _concat(postings: list[array], terms: list[int]) -> np.ndarray:
+    return np.concatenate([np.array(postings[t], np.uintc) for t in terms]) if terms else np.empty(0, np.uintc)
+
+
+def catalog_index(catalog) -> SearchIndex:
+    idx = SearchIndex()
+    idx.add_many((f"festival:{item['slug']}", item) for item in catalog)
+    return idx
+
+
+_shared: dict[str, SearchIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def festival_index() -> SearchIndex:
+    """Process-wide index over the festival catalog."""
+    with _shared_lock:
+        if "festivals" not in _shared:
+            from utils.catalog import CATALOG
+            _shared["festivals"] = catalog_index(CATALOG)
+        return _shared["festivals"]
+
+
+def record_index() -> SearchIndex:
+    """Process-wide index over corpus records; `update()` it from the snapshot, `add()` submissions."""
+    with _shared_lock:
+        return _shared.setdefault("records", SearchIndex())
@@ -0,0 +1,293 @@
+# utils/snapshot.py
+"""Local columnar snapshot of corpus records, kept current with delta syncs.
+
+    python -m utils.snapshot              # sync once (cron / timer), then print a summary
+    python -m utils.snapshot --compact
+
+Records live in Parquet files under CACHE_DIR/snapshot: one compacted base plus small
+delta files, listed in state.json (replaced atomically). A sync asks only for what
+changed: `updated_since` the newest timestamp seen, or, if the API ignores that
+filter, it resumes from the cursor of the last page it read. Readers project columns
+and memory-map the files. Rows are de-duplicated by id, and the newest file wins.
+Fetched rows that the snapshot already holds unchanged are dropped. A sync that finds
+nothing new writes no delta and keeps the version, so caches keyed on it stay valid.
+"""
+from __future__ import annotations
+import argparse, os, threading, time, uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.api_client import CACHE_DIR, _read_json, _write_json
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(CACHE_DIR, "snapshot"))
+SNAPSHOT_PAGE = int(os.getenv("SNAPSHOT_PAGE", "100"))               # records per API request
+SNAPSHOT_MAX_DELTAS = int(os.getenv("SNAPSHOT_MAX_DELTAS", "16"))    # compact beyond this many
+SNAPSHOT_SYNC_EVERY = float(os.getenv("SNAPSHOT_SYNC_EVERY", "300"))  # seconds, for the pages
+
+SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("category_id", pa.string()),
+    ("language", pa.string()),
+    ("release_rights", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("media_type", pa.string()),
+    ("created_at", pa.string()),
+    ("updated_at", pa.string()),
+])
+COLUMNS = SCHEMA.names
+_FRAME_CACHE_SIZE = 8  # (version, columns) frames kept in memory
+
+
+def _row(rec: dict) -> dict:
+    out = {}
+    for field in SCHEMA:
+        v = rec.get(field.name)
+        if pa.types.is_floating(field.type):
+            try:
+                v = float(v) if v not in (None, "") else None
+            except (TypeError, ValueError):
+                v = None
+        elif v is not None:
+            v = str(v)
+        out[field.name] = v
+    return out
+
+
+def _stamps(rows: list[dict]) -> pd.Series:
+    return pd.to_datetime(pd.Series([r.get("updated_at") or r.get("created_at") for r in rows], dtype=object),
+                          utc=True, errors="coerce", format="ISO8601")
+
+
+@dataclass
+class SyncReport:
+    pages: int = 0
+    fetched: int = 0
+    changed: int = 0            # new or changed rows; nothing is written when 0
+    mode: str = "full"          # full | updated_since | cursor
+    version: int = 0
+    seconds: float = 0.0
+
+
+class Snapshot:
+    def __init__(self, root: str = SNAPSHOT_DIR):
+        self.root = root
+        self._state_path = os.path.join(root, "state.json")
+        self._lock = threading.RLock()
+        self._frames: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+        self._syncing = threading.Lock()
+
+    # --------------- state ---------------
+    def state(self) -> dict:
+        st = _read_json(self._state_path)
+        st.setdefault("version", 0)
+        st.setdefault("base", None)
+        st.setdefault("deltas", [])
+        return st
+
+    @property
+    def version(self) -> int:
+        return self.state()["version"]
+
+    def _files(self, st: dict) -> list[str]:
+        return [os.path.join(self.root, f) for f in ([st["base"]] if st["base"] else []) + st["deltas"]]
+
+    def _write(self, table: pa.Table, prefix: str) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        name = f"{prefix}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = os.path.join(self.root, name + ".tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, os.path.join(self.root, name))
+        return name
+
+    # --------------- sync ---------------
+    def sync(self, client, *, max_pages: int | None = None) -> SyncReport:
+        """Fetch records changed since the last sync and append them as a delta file.
+
+        With `max_pages`, a long first sync is spread over several calls. Syncs run one
+        at a time; pages are fetched without holding the read lock, so readers only wait
+        for the delta and state writes.
+        """
+        with self._syncing:
+            return self._sync(client, max_pages)
+
+    def _sync(self, client, max_pages: int | None) -> SyncReport:
+        started = time.perf_counter()
+        st = self.state()
+        pending = st.get("pending")  # the previous sync stopped at max_pages; finish that pass first
+        if pending:
+            since, cursor = pending.get("since"), pending.get("cursor")
+        else:
+            since = st.get("watermark") if st.get("mode") != "cursor" else None
+            cursor = None if since else st.get("resume_cursor")  # "" = resume from the first page
+        report = SyncReport(mode="updated_since" if since else ("cursor" if cursor is not None else "full"))
+        resume, rows, mode, pending = st.get("resume_cursor"), [], st.get("mode"), None
+        while True:
+            if max_pages is not None and report.pages >= max_pages:
+                pending = {"since": since, "cursor": cursor}
+                break
+            items, nxt = client.list_records(cursor or None, limit=SNAPSHOT_PAGE, updated_since=since)
+            report.pages += 1
+            items = [r for r in items if isinstance(r, dict) and r.get("id") is not None]
+            if since and items and (_stamps(items) < pd.Timestamp(since)).any():
+                # Older rows came back: the API ignores updated_since. Page by cursor from now on.
+                mode, since, cursor = "cursor", None, st.get("resume_cursor")
+                report.mode = "cursor"
+                continue
+            rows += items
+            if items and not since:
+                resume = cursor or ""  # re-read this page next time; new records are appended after it
+            if not nxt or not items:
+                break
+            cursor = nxt
+
+        report.fetched = len(rows)
+        table = pa.Table.from_pylist([_row(r) for r in rows], schema=SCHEMA) if rows else None
+        with self._lock:
+            st = self.state()  # compact() may have run meanwhile
+            st["pending"], st["resume_cursor"], st["synced_at"] = pending, resume, time.time()
+            if mode:
+                st["mode"] = mode
+            if rows:
+                newest = _stamps(rows).max()
+                if not pd.isna(newest):
+                    old = st.get("watermark")
+                    st["watermark"] = max(newest, pd.Timestamp(old)).isoformat() if old else newest.isoformat()
+                # updated_since is inclusive and a resumed pass re-reads its last page, so
+                # most syncs return rows the snapshot already has. Only the rest are written.
+                changed = self._changed(table)
+                report.changed = changed.num_rows
+                if changed.num_rows:
+                    st["deltas"].append(self._write(changed, "delta"))
+                    st["version"] += 1
+            _write_json(self._state_path, st)
+            if len(st["deltas"]) > SNAPSHOT_MAX_DELTAS:
+                self.compact()
+            report.version = self.version
+        report.seconds = round(time.perf_counter() - started, 3)
+        return report
+
+    def _changed(self, table: pa.Table) -> pa.Table:
+        """Rows of `table` that are new or differ from the snapshot (the last row per id wins)."""
+        new = table.to_pandas().drop_duplicates("id", keep="last").set_index("id")
+        current = self.read().set_index("id")
+        old = current.reindex(new.index)
+        same = ((new == old) | (new.isna() & old.isna())).all(axis=1) & new.index.isin(current.index)
+        return pa.Table.from_pandas(new[~same].reset_index()[COLUMNS], schema=SCHEMA, preserve_index=False)
+
+    def refresh(self, client, max_age: float = SNAPSHOT_SYNC_EVERY) -> bool:
+        """Start a sync on a daemon thread if the last one is older than `max_age` seconds.
+
+        Returns at once, so page reruns never wait on the API; they read what is there.
+        """
+        st = self.state()
+        if time.time() - float(st.get("synced_at") or 0) < max_age and not st.get("pending"):
+            return False
+        if not self._syncing.acquire(blocking=False):
+            return False  # already running
+
+        def run():
+            try:
+                self._sync(client, None)
+            except Exception:
+                pass  # next refresh tries again
+            finally:
+                self._syncing.release()
+
+        threading.Thread(target=run, name="snapshot-sync", daemon=True).start()
+        return True
+
+    def compact(self) -> None:
+        """Fold the base and all deltas into one de-duplicated base file."""
+        with self._lock:
+            st = self.state()
+            if not st["deltas"]:
+                return
+            old = self._files(st)
+            df = self.read()
+            st["base"] = self._write(pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False), "base")
+            st["deltas"] = []
+            st["version"] += 1
+            st["compacted_at"] = time.time()
+            _write_json(self._state_path, st)
+            for path in old:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # a reader on another process may still have it mapped
+
+    # --------------- read ---------------
+    def read(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """The current records (optionally only `columns`), one row per id. Shared; don't modify."""
+        st = self.state()
+        cols = list(columns) if columns else COLUMNS
+        key = (st["version"], tuple(cols))
+        with self._lock:
+            hit = self._frames.get(key)
+            if hit is not None:
+                self._frames.move_to_end(key)
+                return hit
+        load = cols if "id" in cols else ["id", *cols]
+        tables = []
+        for path in self._files(st):
+            try:
+                tables.append(pq.read_table(path, columns=load, memory_map=True))
+            except FileNotFoundError:
+                if self.version != st["version"]:
+                    return self.read(columns)  # compacted underneath us; state.json has moved on
+        if not tables:
+            df = pa.Table.from_pylist([], schema=SCHEMA).select(load).to_pandas()
+        else:
+            df = pa.concat_tables(tables).to_pandas()
+            if len(tables) > 1:
+                df = df.drop_duplicates("id", keep="last").reset_index(drop=True)
+        df = df[cols]
+        with self._lock:
+            self._frames[key] = df
+            while len(self._frames) > _FRAME_CACHE_SIZE:
+                self._frames.popitem(last=False)
+        return df
+
+
+_shared: Snapshot | None = None
+_shared_lock = threading.Lock()
+
+
+def snapshot() -> Snapshot:
+    """Process-wide snapshot handle."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Snapshot()
+        return _shared
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m utils.snapshot", description="Sync the local records snapshot.")
+    ap.add_argument("--compact", action="store_true", help="compact instead of syncing")
+    ap.add_argument("--max-pages", type=int, help="stop after this many API pages")
+    ap.add_argument("--token", default=os.getenv("API_TOKEN"), help="bearer token (default: $API_TOKEN)")
+    args = ap.parse_args(argv)
+
+    from utils.api_client import SwechaAPIClient
+
+    snap = snapshot()
+    if args.compact:
+        snap.compact()
+    else:
+        client = SwechaAPIClient()
+        if args.token:
+            client.set_auth_token(args.token)
+        print(asdict(snap.sync(client, max_pages=args.max_pages)))
+    st = snap.state()
+    print(f"{len(snap.read(['id'])):,} records · version {st['version']} · {len(st['deltas'])} delta file(s)")
+
+
+if __name__ == "__main__":
+    main()
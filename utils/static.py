@@ -0,0 +1,188 @@
+# utils/static.py
+"""Fingerprinted static assets that browsers can cache for good.
+
+    python -m utils.static build                  # publish festival images + background
+    python -m utils.static serve --port 8502      # companion server, then STATIC_URL=http://host:8502
+
+`publish(path)` copies a file into static/ under a content-hashed name (plus .br/.gz
+siblings for text types). A name never changes its bytes, so it can be cached
+forever. Streamlit serves static/ at /app/static (server.enableStaticServing), but
+with only ETag/Last-Modified. Browsers then revalidate on every visit. For
+`Cache-Control: immutable` and precompressed responses, run `serve` (or give a
+reverse proxy / CDN the same rules) and point STATIC_URL at it.
+"""
+from __future__ import annotations
+import argparse, gzip, hashlib, mimetypes, os, re, shutil, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(APP_ROOT, "static")   # where Streamlit looks, next to Home.py
+STATIC_URL = os.getenv("STATIC_URL", "").rstrip("/")  # companion server / CDN; default: Streamlit's route
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html", ".map")  # images are compressed already
+_FINGERPRINTED = re.compile(r"-[0-9a-f]{12}\.[A-Za-z0-9]+$")
+_published: dict[tuple, str] = {}   # (source, mtime, size) -> fingerprinted name
+_lock = threading.Lock()
+
+
+def _precompress(path: str) -> None:
+    """Write .gz (and .br, if brotli is installed) next to `path` when they are worth it."""
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    variants = [(".gz", lambda b: gzip.compress(b, 9, mtime=0))]
+    try:
+        import brotli  # optional
+        variants.append((".br", lambda b: brotli.compress(b, quality=11)))
+    except ImportError:
+        pass
+    for ext, compress in variants:
+        packed = compress(raw)
+        if len(packed) < 0.9 * len(raw):
+            with open(path + ext + ".tmp", "wb") as fh:
+                fh.write(packed)
+            os.replace(path + ext + ".tmp", path + ext)
+
+
+def publish(path: str) -> str:
+    """Copy `path` into STATIC_DIR as <stem>-<sha256[:12]><ext>; returns that name."""
+    info = os.stat(path)
+    key = (os.path.abspath(path), info.st_mtime, info.st_size)
+    name = _published.get(key)
+    if name is not None:
+        return name
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while block := fh.read(1 << 20):
+            h.update(block)
+    stem, ext = os.path.splitext(os.path.basename(path))
+    name = f"{stem}-{h.hexdigest()[:12]}{ext.lower()}"
+    dest = os.path.join(STATIC_DIR, name)
+    with _lock:
+        if not os.path.exists(dest):  # content-addressed: same name, same bytes
+            os.makedirs(STATIC_DIR, exist_ok=True)
+            shutil.copyfile(path, dest + ".tmp")
+            os.replace(dest + ".tmp", dest)
+            if ext.lower() in COMPRESSIBLE:
+                _precompress(dest)
+        _published[key] = name
+    return name
+
+
+def serving() -> bool:
+    """Whether published files are reachable by the browser."""
+    if STATIC_URL:
+        return True
+    try:
+        from streamlit import config
+        return bool(config.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def url_for(path: str) -> str:
+    """Browser URL of a local file, published on first use; `path` itself when nothing serves static/."""
+    if not serving():
+        return path
+    try:
+        name = publish(path)
+    except OSError:
+        return path
+    return f"{STATIC_URL or '/app/static'}/{name}"
+
+
+# --------------- companion server ---------------
+class StaticHandler(BaseHTTPRequestHandler):
+    """STATIC_DIR with immutable caching for fingerprinted names and .br/.gz negotiation."""
+
+    server_version = "mana-static"
+    root = STATIC_DIR
+
+    def do_GET(self):
+        self._serve(body=True)
+
+    def do_HEAD(self):
+        self._serve(body=False)
+
+    def log_message(self, format, *args):  # quiet; this sits behind a browser on every page load
+        pass
+
+    def _serve(self, body: bool) -> None:
+        rel = unquote(urlsplit(self.path).path)
+        if rel.startswith("/app/static/"):
+            rel = rel[len("/app/static"):]  # same layout as Streamlit's route, for proxies that mirror it
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, rel.lstrip("/")))
+        if not path.startswith(root + os.sep) or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        name = os.path.basename(path)
+        immutable = bool(_FINGERPRINTED.search(name))
+        etag = f'"{name}"' if immutable else f'"{int(os.path.getmtime(path))}-{os.path.getsize(path)}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        accepted = {t.split(";")[0].strip() for t in self.headers.get("Accept-Encoding", "").split(",")}
+        served, encoding = path, None
+        for enc, ext in (("br", ".br"), ("gzip", ".gz")):
+            if enc in accepted and os.path.isfile(path + ext):
+                served, encoding = path + ext, enc
+                break
+
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(served)))
+        self.send_header("Cache-Control", f"public, max-age={STATIC_MAX_AGE}, immutable" if immutable else "no-cache")
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("X-Content-Type-Options", "nosniff")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if body:
+            with open(served, "rb") as fh:
+                shutil.copyfileobj(fh, self.wfile)
+
+
+def build() -> list[str]:
+    """Publish every festival image variant and the default background; returns the names."""
+    from utils.images import DERIVED_DIR, ensure_derivatives, festival_sources
+    from utils.ui import _BG_DEFAULT, blurred_bg_file
+
+    names = []
+    manifest = ensure_derivatives(festival_sources())
+    for entry in manifest.values():
+        for files in entry["variants"].values():
+            names += [publish(os.path.join(DERIVED_DIR, f)) for f in files.values()]
+    names.append(publish(blurred_bg_file(_BG_DEFAULT)))
+    return names
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m utils.static", description="Publish or serve static assets.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="publish festival images and the background into static/")
+    sp = sub.add_parser("serve", help="serve static/ with immutable caching and precompressed variants")
+    sp.add_argument("--host", default="0.0.0.0")
+    sp.add_argument("--port", type=int, default=8502)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        names = build()
+        print(f"{len(names)} files in {STATIC_DIR}")
+    else:
+        httpd = ThreadingHTTPServer((args.host, args.port), StaticHandler)
+        print(f"serving {STATIC_DIR} on http://{args.host}:{args.port}")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
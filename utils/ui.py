@@ -1,10 +1,72 @@
 ﻿# utils/ui.py
 from __future__ import annotations
+import base64, functools, hashlib, io, os, uuid
 import streamlit as st
 
+from utils.api_client import CACHE_DIR, SwechaAPIClient, client_for
+from utils.static import url_for
+from utils.warmup import start as start_warmup
+
 _BG_DEFAULT = "assets/bg/goddess_bg.png"   # <- your file exists as .png
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BG_WIDTH = 480        # px; the image is blurred anyway, so the browser can upscale it
+_BG_VIEWPORT = 1920    # px; viewport width `blur_px` is specified against
+
+
+def _resolve(image_path: str) -> str:
+    return image_path if os.path.isabs(image_path) else os.path.join(_APP_ROOT, image_path)
+
+
+def _render_blurred_bg(src: str, blur_px: int, opacity: float) -> bytes:
+    """Downscale, blur and fade `src` onto the theme surface; returns JPEG bytes."""
+    from PIL import Image, ImageFilter
+    from utils.images import _flatten
+
+    im = _flatten(Image.open(src))
+    im = im.resize((_BG_WIDTH, max(1, round(im.height * _BG_WIDTH / im.width))), Image.Resampling.LANCZOS)
+    im = im.filter(ImageFilter.GaussianBlur(blur_px * _BG_WIDTH / _BG_VIEWPORT))
+    surface = Image.new("RGB", im.size, (14, 15, 19))  # .streamlit/config.toml backgroundColor
+    out = Image.blend(surface, im, opacity)
+    buf = io.BytesIO()
+    out.save(buf, "JPEG", quality=70, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+@functools.lru_cache(maxsize=16)
+def _blurred_bg_file(src: str, blur_px: int, opacity: float, mtime: float) -> str:
+    tag = hashlib.sha256(f"{src}|{mtime}|{blur_px}|{opacity}|{_BG_WIDTH}".encode()).hexdigest()[:16]
+    path = os.path.join(CACHE_DIR, "bg", f"{os.path.splitext(os.path.basename(src))[0]}-{tag}.jpg")
+    if not os.path.exists(path):
+        data = _render_blurred_bg(src, blur_px, opacity)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as fh:
+            fh.write(data)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def blurred_bg_file(image_path: str = _BG_DEFAULT, blur_px: int = 18, opacity: float = 0.28) -> str:
+    """Pre-rendered background JPEG, cached on disk per (image, blur, opacity)."""
+    src = _resolve(image_path)
+    return _blurred_bg_file(src, blur_px, opacity, os.path.getmtime(src))
+
+
+@functools.lru_cache(maxsize=16)
+def _data_uri(path: str) -> str:
+    with open(path, "rb") as fh:
+        return "data:image/jpeg;base64," + base64.b64encode(fh.read()).decode()
+
 
 def set_blurred_bg(image_path: str = _BG_DEFAULT, *, blur_px: int = 18, opacity: float = 0.28) -> None:
+    start_warmup()  # every page calls this first; a no-op once the process is warm
+    try:
+        path = blurred_bg_file(image_path, blur_px, opacity)
+        url, effects = url_for(path), ""  # cacheable URL instead of base64 on every rerun
+        if url == path:
+            url = _data_uri(path)  # static serving is off
+    except Exception:
+        # fall back to letting the browser do the work
+        url, effects = image_path, f"filter: blur({blur_px}px); opacity: {opacity};"
     st.markdown(
         f"""
         <style>
@@ -12,9 +74,8 @@ def set_blurred_bg(image_path: str = _BG_DEFAULT, *, blur_px: int = 18, opacity:
             content: "";
             position: fixed;
             inset: 0;
-            background: url('{image_path}') center/cover no-repeat fixed;
-            filter: blur({blur_px}px);
-            opacity: {opacity};
+            background: url('{url}') center/cover no-repeat;
+            {effects}
             z-index: -1;
         }}
         [data-testid="stHeader"] {{ background: transparent; }}
@@ -29,3 +90,35 @@ def require_auth() -> bool:
         st.page_link("Home.py", label="Go to Login →")
         return False
     return True
+
+def get_client() -> SwechaAPIClient:
+    """This browser session's API client: its own token, the process's shared connection pool."""
+    client = client_for(st.session_state.setdefault("client_key", uuid.uuid4().hex))
+    token = st.session_state.get("access_token")
+    if token and token != client.token:
+        client.set_auth_token(token)
+    return client
+
+
+@functools.cache
+def _media_upload_component():
+    import streamlit.components.v1 as components
+    return components.declare_component("media_upload", path=os.path.join(_APP_ROOT, "components", "media_upload"))
+
+def media_uploader(label: str, *, key: str) -> dict | None:
+    """Chunked browser upload to utils.media.ChunkReceiver; None when MEDIA_UPLOAD_PORT is off.
+
+    Returns {"slot", "filename", "size", "done"} once a file is chosen ({} before that);
+    `utils.media.receive(slot, filename)` spools it when done. Never holds the file in memory.
+    """
+    from utils import media
+
+    if not media.start_receiver():
+        return None
+    slot, token = st.session_state.setdefault(f"{key}_slot", media.upload_slot())
+    value = _media_upload_component()(
+        label=label, slot=slot, token=token, url=media.MEDIA_UPLOAD_URL, port=media.MEDIA_UPLOAD_PORT,
+        chunk_size=media.MEDIA_CHUNK_SIZE, max_bytes=media.MEDIA_MAX_BYTES, accept=media.ACCEPTED,
+        key=key, default=None,
+    )
+    return value if value and value.get("slot") == slot else {}
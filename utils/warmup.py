@@ -0,0 +1,195 @@
+# utils/warmup.py
+"""Do the first visitor's work before there is a first visitor.
+
+    python -m utils.warmup                        # run every step, print timings
+    python -m utils.warmup serve [-- --server.port 8501]   # warm up, then start Streamlit here
+
+Steps: resolve config, build the API client, open pooled connections to API_BASE,
+fetch categories, build the festival and record search indexes and the duplicate
+index, decode festival images into card variants, render the background, and
+publish both as static assets. Each step is timed. A failing step is recorded, not raised, so a cold or unreachable
+API never keeps the app from starting.
+
+Disk caches (image variants, background, HTTP cache, login route) outlive the
+process, so a separate run fills them for later servers. Connections and
+in-memory indexes do not. `serve` warms them in the process that then serves,
+and a plain `streamlit run` gets the same steps on a background thread from the
+first page load (`start()`, called by utils/ui.py).
+"""
+from __future__ import annotations
+import argparse, importlib, os, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))  # kept-alive connections to open up front
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "5"))         # seconds per network step
+WARMUP = os.getenv("WARMUP", "true").lower() in ("1", "true", "yes", "on")  # background warm-up from ui.py
+
+_report: list[dict] | None = None
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+
+
+# --------------- steps: each returns a short detail string ---------------
+def _config() -> str:
+    mod = importlib.import_module("utils.api_client")  # env, then config.settings overrides
+    return f"{mod.API_BASE}" + (" (demo mode)" if mod.DEMO_MODE else "")
+
+
+def _client() -> str:
+    from utils.api_client import client_for
+    client = client_for("warmup")  # shared transport and HTTP cache come up with the first client
+    return "HTTP cache " + ("open" if client.http_cache else "off")
+
+
+def _connections() -> str:
+    from utils.api_client import DEMO_MODE, HTTP_POOL_SIZE, client_for
+    if DEMO_MODE:
+        return "skipped (demo mode)"
+    client = client_for("warmup")
+    n = max(1, min(WARMUP_CONNECTIONS, HTTP_POOL_SIZE))
+
+    def ping(_) -> int:
+        # Concurrent requests each take their own connection (and TLS handshake);
+        # all of them go back to the keep-alive pool afterwards.
+        try:
+            return client._send("HEAD", "", deadline=time.monotonic() + WARMUP_TIMEOUT, allow_redirects=False).status_code
+        except Exception:
+            return 0
+
+    with ThreadPoolExecutor(n) as pool:
+        codes = list(pool.map(ping, range(n)))
+    opened = sum(1 for c in codes if c)
+    if not opened:
+        raise ConnectionError(f"{client.api_base} did not answer")
+    return f"{opened}/{n} to {client.api_base}"
+
+
+def _categories() -> str:
+    from utils.api_client import client_for
+    cats = client_for("warmup").get_categories(deadline=WARMUP_TIMEOUT)
+    if not cats:
+        raise LookupError("no categories endpoint answered")
+    return f"{len(cats)} categories"
+
+
+def _search() -> str:
+    from utils.search import festival_index, record_index
+    from utils.snapshot import snapshot
+    index = record_index()
+    index.update(snapshot())
+    return f"{len(festival_index())} festivals, {len(index)} records"
+
+
+def _duplicates() -> str:
+    from utils.dedup import duplicate_index
+    from utils.snapshot import snapshot
+    index = duplicate_index()
+    index.update(snapshot())
+    return f"{len(index)} records"
+
+
+def _images() -> str:
+    from utils.catalog import CATALOG
+    from utils.images import ensure_derivatives
+    manifest = ensure_derivatives([item["img"] for item in CATALOG])  # same sources as Explore's cards
+    return f"{len(manifest)} sources"
+
+
+def _background() -> str:
+    from utils.ui import _data_uri, blurred_bg_file
+    path = blurred_bg_file()
+    _data_uri(path)  # the inline fallback, for when static serving is off
+    return os.path.basename(path)
+
+
+def _static() -> str:
+    from utils.static import build, serving
+    if not serving():
+        return "skipped (static serving off)"
+    return f"{len(build())} files"
+
+
+STEPS = (
+    ("config", _config),
+    ("client", _client),
+    ("connections", _connections),
+    ("categories", _categories),
+    ("search index", _search),
+    ("duplicate index", _duplicates),
+    ("festival images", _images),
+    ("background", _background),
+    ("static assets", _static),
+)
+
+
+def warm_up(*, force: bool = False) -> list[dict]:
+    """Run every step once per process; later calls return the first report."""
+    global _report
+    with _lock:
+        if _report is not None and not force:
+            return _report
+        rows = []
+        for name, step in STEPS:
+            started = time.perf_counter()
+            try:
+                detail, ok = step(), True
+            except Exception as e:
+                detail, ok = f"{type(e).__name__}: {e}", False
+            rows.append({"step": name, "ms": round((time.perf_counter() - started) * 1000, 1), "ok": ok, "detail": detail})
+        _report = rows
+        return rows
+
+
+def report() -> list[dict] | None:
+    """The finished warm-up report, or None while it hasn't run (or is still running)."""
+    return _report
+
+
+def start() -> None:
+    """Warm up on a daemon thread, once per process; returns immediately."""
+    global _thread
+    if not WARMUP or _report is not None:
+        return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_up, name="warmup", daemon=True)
+            _thread.start()
+
+
+def _print(rows: list[dict]) -> None:
+    width = max(len(r["step"]) for r in rows)
+    for r in rows:
+        print(f"{r['step']:<{width}}  {r['ms']:>9.1f} ms  {'ok  ' if r['ok'] else 'FAIL'}  {r['detail']}")
+    print(f"{'total':<{width}}  {sum(r['ms'] for r in rows):>9.1f} ms")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m utils.warmup", description="Pre-build caches and open API connections.")
+    ap.add_argument("cmd", nargs="?", choices=("run", "serve"), default="run",
+                    help="run: warm up and exit; serve: warm up, then start Streamlit in this process")
+    ap.add_argument("streamlit_args", nargs=argparse.REMAINDER, help="passed to `streamlit run` (after --)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "run":
+        rows = warm_up()
+        _print(rows)
+        return 0 if all(r["ok"] for r in rows) else 1
+
+    # Warm up once Streamlit has parsed its config and flags (the static step reads
+    # them) but before the server starts listening.
+    from streamlit import config
+    from streamlit.web import cli as stcli
+
+    def ready() -> None:
+        disconnect()
+        _print(warm_up())
+
+    disconnect = config.on_config_parsed(ready, force_connect=True)
+    extra = [a for a in args.streamlit_args if a != "--"]
+    sys.argv = ["streamlit", "run", os.path.join(APP_ROOT, "Home.py"), *extra]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())